@@ -1,5 +1,248 @@
-import graphviz
-from random import random # used with graphviz
+import gc
+import os
+
+# ------------------------------------------------
+#   Red-black tree helpers: plain functions on nodes, so
+#   hot loops can bind them as locals (see `RedBlackBST.put`).
+# ------------------------------------------------
+RED = True
+BLACK = False
+LEFT = 0    # indices of a node's children in `_RBNode.c`
+RIGHT = 1
+
+
+def _size(node):
+    """
+    Returns the size of the subtree rooted at `node`.
+    """
+    return 0 if node is None else node.size
+
+
+def _is_red(node):
+    """
+    Is `node` RED?
+    By default, null links are BLACK.
+    """
+    if node is None:
+        return False
+
+    return node._sc & 1 == 1
+
+
+def _rotate(subtree, d):
+    """
+    Rotates the red link between `subtree` and its child
+    `subtree.c[1 - d]` to the other side, `d` (`LEFT` or `RIGHT`).
+    
+    (a) save the `child` node;
+    
+    (b) move nodes between `child` and `subtree`, i.e.
+    `child.c[d]`, to `subtree.c[1 - d]`;
+    
+    (c) set `child`'s link on side `d` to `subtree`
+    
+    (d) update colors
+    
+    (e) update sizes
+    
+    (f) return the new subtree root
+
+    PS.: (d) and (e) are done at once on the packed `_sc`, from
+    the sizes before the rotation, which must be up to date.
+    """
+    c = subtree.c
+    child = c[1 - d]                    # (a)
+    c[1 - d] = child.c[d]               # (b)
+    child.c[d] = subtree                # (c)
+    # (d) and (e): `child` takes `subtree`'s color and size,
+    # `subtree` turns RED and loses `child` and its other subtree
+    # (the one on side `1 - d`, untouched by the rotation)
+    child._sc = subtree._sc
+    size = (subtree._sc >> 1) - 1 - _size(child.c[1 - d])
+    subtree._sc = size << 1 | RED
+    # (f)
+    return child
+
+
+def _rotate_left(subtree):
+    """
+    Orient a (temporarily) right-leaning red link to lean left.
+    """
+    return _rotate(subtree, LEFT)
+
+
+def _rotate_right(subtree):
+    """
+    Orient a left-leaning red link to lean right.
+    
+                    (subtree)
+                   /         \
+        (left_node)
+    """
+    return _rotate(subtree, RIGHT)
+
+
+def _flip_colors(subtree):
+    """
+    Flip the colors of a node and its two children.
+    `subtree` must have opposite color of its two children.
+
+    Returns True if the colors were flipped, False otherwise.
+    """
+    if subtree is None:
+        return False
+
+    left, right = subtree.c
+    if left is None or right is None:
+        return False
+
+    # compare the raw color bits, not the `color` properties
+    left_color = left._sc & 1
+    if left_color != right._sc & 1 or left_color == subtree._sc & 1:
+        return False
+
+    subtree._sc ^= 1
+    left._sc    ^= 1
+    right._sc   ^= 1
+
+    return True
+
+
+def _restore_balance(subtree):
+    # read each child and its color bit once: the decisions below
+    # reuse these locals instead of calling `_is_red` on links
+    left, right = subtree.c
+    left_red = left is not None and left._sc & 1
+    right_red = right is not None and right._sc & 1
+
+    # update sizes first: rotations keep them up to date
+    size = 1 + (0 if left is None else left._sc >> 1) \
+        + (0 if right is None else right._sc >> 1)
+    subtree._sc = size << 1 | subtree._sc & 1
+
+    # no red child (the common case): nothing to fix
+    if left_red or right_red:
+        # right-leaning red link (if the left link is red too, a
+        # rotation would just be undone: the flip below fixes it)
+        if right_red and not left_red:
+            subtree = _rotate(subtree, LEFT)
+            left, right = subtree.c
+            left_red = True     # the old root, turned RED
+            right_red = right is not None and right._sc & 1
+
+        # two consecutives left-leaning red links
+        if left_red:
+            left_left = left.c[0]
+            if left_left is not None and left_left._sc & 1:
+                subtree = _rotate(subtree, RIGHT)
+                left, right = subtree.c
+                right_red = True    # the old root, turned RED
+
+        # two red children
+        if left_red and right_red:
+            _flip_colors(subtree)
+
+    return subtree
+
+
+class _RBNode:
+    """
+    Node of a `RedBlackBST` (also known as `RedBlackBST._Node`).
+
+    The node's size and color are packed in a single int,
+    `_sc = size << 1 | color`, and exposed as properties.
+
+    Its children are kept in a list, `c = [left, right]`, so
+    that code symmetric in left and right (e.g. `_rotate`) can
+    index it by side; `left` and `right` are views of it.
+
+    Nodes compare and hash by identity (the default): two
+    nodes are the same node, not two nodes with equal fields.
+
+    Nodes removed from a tree are `free`d to a pool, from
+    which `alloc` takes them back before creating new ones.
+    """
+    __slots__ = ('key', 'val', 'c', '_sc')
+
+    POOL_MAX_SIZE = 10_000
+    _pool = []
+
+    def __init__(self, key, val, size=1, color=RED):
+        if __debug__:
+            self.assert_color(color)
+        self.key = key
+        self.val = val
+        self.c = [None, None]
+        self._sc = size << 1 | color
+
+    def assert_color(self, color):
+        if color not in (BLACK, RED):
+            raise ValueError("Invalid color value.")
+
+    @classmethod
+    def alloc(cls, key, val, size=1, color=RED):
+        """
+        Same as `_RBNode(key, val, size, color)`, but reuses
+        a freed node when there is one.
+        """
+        if not cls._pool:
+            return cls(key, val, size, color)
+
+        node = cls._pool.pop()
+        if __debug__:
+            node.assert_color(color)
+        node.key = key
+        node.val = val
+        node._sc = size << 1 | color
+
+        return node
+
+    def free(self):
+        """
+        Clears a node removed from the tree (breaking its links
+        to other nodes) and keeps it to be reused by `alloc`.
+        """
+        self.key = self.val = None
+        self.c[0] = self.c[1] = None
+
+        if len(self._pool) < self.POOL_MAX_SIZE:
+            self._pool.append(self)
+
+    @property
+    def left(self):
+        return self.c[0]
+
+    @left.setter
+    def left(self, node):
+        self.c[0] = node
+
+    @property
+    def right(self):
+        return self.c[1]
+
+    @right.setter
+    def right(self, node):
+        self.c[1] = node
+
+    @property
+    def color(self):
+        return bool(self._sc & 1)
+
+    @color.setter
+    def color(self, color):
+        self._sc = self._sc & ~1 | bool(color)
+
+    @property
+    def size(self):
+        return self._sc >> 1
+
+    @size.setter
+    def size(self, size):
+        self._sc = size << 1 | self._sc & 1
+
+    def __repr__(self) -> str:
+        return f"_Node(key={self.key}, val={self.val}, size={self.size}, color={'RED' if self.color else 'BLACK'})"
+
 
 class RedBlackBST:
     """
@@ -55,134 +298,28 @@ class RedBlackBST:
     black parent to red.
     """
 
-    RED = True
-    BLACK = False
+    RED = RED
+    BLACK = BLACK
     NOT_BST = "Not in symmetric order"
     NOT_23TREE = "Not a 2-3 tree"
     NOT_BALANCED = "Not balanced"
     NOT_SIZE_CONSISTENT = "Subtree counts not consistent"
     RED_ROOT = "BST's root cannot be RED"
 
+    _Node = _RBNode
+
     def __init__(self):
         self.root = None
+        self._leftmost = None   # cached node with the smallest key
 
-    class _Node:
-        def __init__(self, key, val, size=1, color=None):
-            self.assert_color(color)
-            self.color = RedBlackBST.RED if color is None else color
-            self.key = key
-            self.val = val
-            self.left = None
-            self.right = None
-            self.size = size
-
-        def assert_color(self, color):
-            if color not in [None, RedBlackBST.BLACK, RedBlackBST.RED]:
-                raise ValueError("Invalid color value.")
-
-        def __repr__(self) -> str:
-            return f"_Node(key={self.key}, val={self.val}, size={self.size}, color={'RED' if self.color else 'BLACK'})"
-    
-        def __eq__(self, other):
-            if isinstance(other, RedBlackBST._Node):
-                return self.key == other.key \
-                    and self.val == other.val \
-                    and self.size == other.size \
-                    and self.color == other.color
-            else:
-                raise TypeError
     # ------------------------------------------------
     #   New methods/properties.
     # ------------------------------------------------
-    def is_red(self, node):
-        """
-        Is `node` RED?
-        By default, null links are BLACK.
-        """
-        if node is None:
-            return False
-
-        return node.color
-
-    def _rotate_left(self, subtree):
-        """
-        Orient a (temporarily) right-leaning red link to lean left.
-        
-        (a) save `red_right` node;
-        
-        (b) move nodes between `root` and `red_right`,
-        i.e. `red_right.left`, to `subtree.right`;
-        
-        (c) set `red_right` left link to node at `root`
-        
-        (d) update colors
-        
-        (e) update sizes
-        
-        (f) return the new subtree root
-        """
-        right_node = subtree.right           # (a)
-        subtree.right = right_node.left      # (b)
-        right_node.left = subtree            # (c)
-        # (d)
-        right_node.color = subtree.color
-        subtree.color = RedBlackBST.RED
-        # (e)
-        right_node.size = subtree.size
-        subtree.size = 1 + self._size(subtree.left) + self._size(subtree.right)
-        # (f)
-        return right_node
-
-    def _rotate_right(self, subtree):
-        """
-        Orient a left-leaning link to the left.
-        
-        (a) save `left_node` node;
-        
-        (b) move nodes between `left_node` and `subtree`,
-        i.e. `left_node.right`, to `subtree.left`;
-        
-        (c) set `left_node`'s right link to node at `root`
-        
-        (d) update colors
-        
-        (e) update sizes
-        
-        (f) return the new subtree root
-        
-                        (subtree)
-                       /         \
-            (left_node)
-        """
-        left_node = subtree.left            # (a)
-        subtree.left = left_node.right      # (b)
-        left_node.right = subtree           # (c)
-        # (d)
-        left_node.color = subtree.color
-        subtree.color = RedBlackBST.RED
-        # (e)
-        left_node.size = subtree.size
-        subtree.size = 1 + self._size(subtree.left) + self._size(subtree.right)
-        # (f)
-        return left_node
-
-    def _flip_colors(self, subtree):
-        """
-        Flip the colors of a node and its two children.
-        `subtree` must have opposite color of its two children.
-        """
-        if subtree is None or subtree.left is None or subtree.right is None:
-            return
-        
-        if (subtree.left.color != subtree.right.color) or \
-            (subtree.color == subtree.left.color):
-            return        
-        
-        subtree.color       = not subtree.color
-        subtree.left.color  = not subtree.left.color
-        subtree.right.color = not subtree.right.color
-        
-        return True
+    is_red = staticmethod(_is_red)
+    _rotate_left = staticmethod(_rotate_left)
+    _rotate_right = staticmethod(_rotate_right)
+    _flip_colors = staticmethod(_flip_colors)
+    restore_balance = staticmethod(_restore_balance)
 
     def _move_red_left(self, subtree):
         """
@@ -196,17 +333,17 @@ class RedBlackBST:
         if not subtree.color:
             return subtree
         
-        if self.is_red(subtree.left) \
-                and self.is_red(subtree.left.left):
+        if _is_red(subtree.left) \
+                and _is_red(subtree.left.left):
             return subtree
         
-        self._flip_colors(subtree)
+        _flip_colors(subtree)
         
         # right subtree is red now, gotta fix it
-        if self.is_red(subtree.right.left):
-            subtree.right = self._rotate_right(subtree.right)
-            subtree = self._rotate_left(subtree)
-            self._flip_colors(subtree)
+        if _is_red(subtree.right.left):
+            subtree.right = _rotate_right(subtree.right)
+            subtree = _rotate_left(subtree)
+            _flip_colors(subtree)
         
         return subtree
 
@@ -219,39 +356,103 @@ class RedBlackBST:
         if subtree is None:
             return subtree
         
-        if not self.is_red(subtree):
+        if not _is_red(subtree):
             return subtree
         
-        if self.is_red(subtree.right) \
-                and self.is_red(subtree.right.left):
+        if _is_red(subtree.right) \
+                and _is_red(subtree.right.left):
             return subtree
         
-        self._flip_colors(subtree)
+        _flip_colors(subtree)
         
-        if self.is_red(subtree.left.left):
-            subtree = self._rotate_right(subtree)
-            self._flip_colors(subtree)
+        if _is_red(subtree.left.left):
+            subtree = _rotate_right(subtree)
+            _flip_colors(subtree)
         
         return subtree
 
-    def restore_balance(self, subtree):
-        # right-leaning red link
-        if self.is_red(subtree.right) and not self.is_red(subtree.left):
-            subtree = self._rotate_left(subtree)
-        
-        # two consecutives left-leaning red links
-        if self.is_red(subtree.left) and self.is_red(subtree.left.left):
-            subtree = self._rotate_right(subtree)
-        
-        # two red children
-        if self.is_red(subtree.left) and self.is_red(subtree.right):
-            self._flip_colors(subtree)
-        
-        # update sizes
-        subtree.size = 1 + self._size(subtree.left) + self._size(subtree.right)
-        
+    @classmethod
+    def from_sorted(cls, pairs):
+        """
+        Builds a red-black BST from `(key, value)` pairs given in
+        strictly ascending key order, in linear time.
+
+        Instead of `put`ting each pair (rotations and color flips
+        on every insertion), the tree is laid out directly as a
+        2-3 tree with all null links at the same depth:
+
+        (a) the black height `h` is `floor(log2(n + 1))`, since a
+        2-3 tree of height `h` holds from `2^h - 1` to `3^h - 1` keys;
+
+        (b) each subtree is a 2-node if its remaining keys fit in
+        two subtrees of height `h - 1`, otherwise a 3-node, i.e.
+        a black node with a red left child;
+
+        (c) keys are split evenly among the children, so every
+        subtree gets a valid number of keys for its height.
+        """
+        items = list(pairs)
+
+        for i in range(1, len(items)):
+            if not items[i - 1][0] < items[i][0]:
+                raise ValueError("Keys must be in strictly ascending order.")
+
+        bst = cls()
+        n = len(items)
+        bst.root = bst._build(items, 0, n, (n + 1).bit_length() - 1)
+
+        return bst
+
+    def _build(self, items, lo, hi, height):
+        """
+        Builds a subtree of black height `height` from `items[lo:hi]`
+        and returns its (BLACK) root.
+        """
+        if height == 0:
+            return None
+
+        count = hi - lo
+        child_max = 3 ** (height - 1) - 1
+
+        # (b) 2-node
+        if count - 1 <= 2 * child_max:
+            mid = lo + (count - 1) // 2
+            subtree = self._Node.alloc(*items[mid], size=count,
+                                       color=RedBlackBST.BLACK)
+            subtree.left = self._build(items, lo, mid, height - 1)
+            subtree.right = self._build(items, mid + 1, hi, height - 1)
+            return subtree
+
+        # (b) 3-node: (red_left) < (subtree)
+        rest = count - 2
+        mid_left = lo + rest // 3
+        mid_right = mid_left + 1 + (rest - rest // 3) // 2
+
+        red_left = self._Node.alloc(*items[mid_left], size=mid_right - lo,
+                                    color=RedBlackBST.RED)
+        red_left.left = self._build(items, lo, mid_left, height - 1)
+        red_left.right = self._build(items, mid_left + 1, mid_right, height - 1)
+
+        subtree = self._Node.alloc(*items[mid_right], size=count,
+                                   color=RedBlackBST.BLACK)
+        subtree.left = red_left
+        subtree.right = self._build(items, mid_right + 1, hi, height - 1)
+
         return subtree
-        
+
+    def freeze(self):
+        """
+        Moves every object currently tracked by the garbage collector,
+        including all nodes of this tree, to a permanent generation
+        that future collections ignore.
+
+        Meant for long-lived trees, e.g. right after `from_sorted`:
+        collections no longer have to visit every node. Nodes added
+        afterwards are still tracked as usual.
+        """
+        gc.collect()
+        gc.freeze()
+
     # ------------------------------------------------
     #   Check integrity of red-black tree data structure.
     # ------------------------------------------------
@@ -277,30 +478,31 @@ class RedBlackBST:
         Does this binary tree satisfy symmetric order?
         Note: this test also ensures that data structure is a binary
         tree since order is strict.
-        """
-        return self._is_BST(self.root, None, None)
-        
-    def _is_BST(self, subtree, lo, hi):
-        """
-        Is the tree rooted at `subtree` a BST with all keys strictly
-        between `lo` and `hi` (both inclusive)?
+
+        Walks the tree with an explicit stack of (subtree, lo, hi):
+        every key must lie strictly between `lo` and `hi`.
         If `lo` or `hi` is null, treat as empty constraint.
         """
-        if subtree is None:
-            return True
-        
-        this_key = subtree.key
-        
-        if (lo is not None) and (this_key <= lo):
-            return False
-        
-        if (hi is not None) and (this_key >= hi):
-            return False
-        
-        # key == 2
-        return self._is_BST(subtree.left, lo=lo, hi=this_key) \
-            and self._is_BST(subtree.right, lo=this_key, hi=hi)
-    
+        stack = [(self.root, None, None)]
+
+        while stack:
+            subtree, lo, hi = stack.pop()
+            if subtree is None:
+                continue
+
+            this_key = subtree.key
+
+            if (lo is not None) and (this_key <= lo):
+                return False
+
+            if (hi is not None) and (this_key >= hi):
+                return False
+
+            stack.append((subtree.left, lo, this_key))
+            stack.append((subtree.right, this_key, hi))
+
+        return True
+
     @property
     def is_size_consistent(self):
         """
@@ -308,25 +510,22 @@ class RedBlackBST:
         consistent in the data structure rooted at that node,
         false otherwise.
         """
-        return self._is_size_consistent(self.root)
-    
-    def _is_size_consistent(self, subtree):
-        if subtree is None:
-            return True
-        
-        subtree_size = self._size(subtree)
+        stack = [self.root]
+
+        while stack:
+            subtree = stack.pop()
+            if subtree is None:
+                continue
+
+            expected = 1 + _size(subtree.left) + _size(subtree.right)
+            if subtree.size != expected:
+                return False
+
+            stack.append(subtree.left)
+            stack.append(subtree.right)
+
+        return True
 
-        expected = (
-            1
-            + self._size(subtree.left)
-            + self._size(subtree.right)
-        )
-        if subtree_size != expected:
-            return False
-        
-        return self._is_size_consistent(subtree.left) and \
-            self._is_size_consistent(subtree.right)
-    
     @property
     def is_23tree(self):
         """
@@ -334,28 +533,29 @@ class RedBlackBST:
         - No right-leaning red link;
         - AND no node is connected to two red links.
         """
-        return self._is_23tree(self.root)
-    
-    def _is_23tree(self, subtree):
-        """
-        - No right-leaning red link;
-        - AND no node is connected to two red links.
-        """
-        if subtree is None:
-            return True
-        
-        # no red right links
-        if self.is_red(node=subtree.right):
-            return False
-        
-        # no node is connected to two red links
-        # PS.: exempt root because it should never be RED
-        if (subtree is not self.root) and \
-            self.is_red(subtree) and \
-                self.is_red(subtree.left):
-            return False
-        return self._is_23tree(subtree.left) and self._is_23tree(subtree.right)
-    
+        stack = [self.root]
+
+        while stack:
+            subtree = stack.pop()
+            if subtree is None:
+                continue
+
+            # no red right links
+            if _is_red(subtree.right):
+                return False
+
+            # no node is connected to two red links
+            # PS.: exempt root because it should never be RED
+            if (subtree is not self.root) and \
+                _is_red(subtree) and \
+                    _is_red(subtree.left):
+                return False
+
+            stack.append(subtree.left)
+            stack.append(subtree.right)
+
+        return True
+
     @property
     def is_balanced(self):
         """
@@ -371,53 +571,77 @@ class RedBlackBST:
             if not self.is_red(subtree):
                 black += 1
             subtree = subtree.left
-        
-        # check starting from root
-        return self._is_balanced(self.root, black)
-    
-    def _is_balanced(self, subtree, black):
-        """
-        - Every path from root to null link has same number
-        of black links.
-        - Never two red links in-a-row.
-        """
-        # hit a leaf, aka null link
-        if subtree is None:
-            return black == 0
-        
-        # decrease reference count
-        if not self.is_red(subtree):
-            black -= 1
-        
-        # recursively check left and right subtree
-        return self._is_balanced(subtree.left, black) and \
-            self._is_balanced(subtree.right, black)
+
+        # every path from root to null link has the same number
+        # of black links: walk it with a stack of (subtree, black
+        # links still expected below it)
+        stack = [(self.root, black)]
+
+        while stack:
+            subtree, black = stack.pop()
+
+            # hit a leaf, aka null link
+            if subtree is None:
+                if black != 0:
+                    return False
+                continue
+
+            # decrease reference count
+            if not _is_red(subtree):
+                black -= 1
+
+            stack.append((subtree.left, black))
+            stack.append((subtree.right, black))
+
+        return True
         
     # ------------------------------------------------
     #   Overridden BST methods/properties.
     # ------------------------------------------------
     def put(self, k, v):
-        self.root = self._put(k, v, self.root)
-        self.root.color = RedBlackBST.BLACK
-
-    def _put(self, k, v, subtree):
+        """
+        Inserts the key-value pair in a single iterative pass.
+        """
         # -------------------------------------------------
-        # (1) puts new node just like a normal BST
-        if subtree is None:
-            return self._Node(k, v)
-        
-        if k == subtree.key:
-            subtree.val = v
-        
-        elif k < subtree.key:
-            subtree.left = self._put(k, v, subtree.left)
-        
-        else: # k > subtree.key
-            subtree.right = self._put(k, v, subtree.right)
-        
+        # (1) puts new node just like a normal BST, saving
+        # the path from the root down to its parent
+        path = []
+        append = path.append
+        subtree = self.root
+
+        while subtree is not None:
+            key = subtree.key
+
+            if k == key:
+                # just update the value: no new node, no fix-up
+                subtree.val = v
+                return
+
+            append(subtree)
+            subtree = subtree.c[k >= key]
+
         # -------------------------------------------------
-        # (2) fix-up color links if necessary
-        return self.restore_balance(subtree)
+        # (2) walk the path back up, linking each (possibly
+        # rotated) subtree to its parent and fixing-up color
+        # links if necessary
+        restore_balance = _restore_balance
+        subtree = node = self._Node.alloc(k, v)
+
+        for parent in reversed(path):
+            parent.c[k >= parent.key] = subtree
+            subtree = restore_balance(parent)
+
+        self.root = subtree
+
+        # root is always BLACK: only a color flip at the root turns
+        # it RED, so most insertions need no write here
+        if subtree._sc & 1:
+            subtree._sc &= ~1
+
+        # nodes are never replaced by rotations: just check for a new min
+        leftmost = self._leftmost
+        if leftmost is not None and k < leftmost.key:
+            self._leftmost = node
 
     def del_min(self):
         """
@@ -437,6 +661,9 @@ class RedBlackBST:
         if not self.is_empty:
             # restore root BACK to BLACK
             self.root.color = RedBlackBST.BLACK;
+
+        # the new min is the next node up the left spine
+        self._leftmost = self._min(self.root)
         
     def _del_min(self, subtree):
         """
@@ -444,6 +671,7 @@ class RedBlackBST:
         # if given node is the smallest
         if subtree.left is None:
             # replace the node with its right link
+            subtree.free()
             return None
         
         if not self.is_red(subtree.left) and not self.is_red(subtree.left.left):
@@ -462,6 +690,7 @@ class RedBlackBST:
             self.root.color = RedBlackBST.RED
 
         self.root = self._del_max(self.root)
+        self._leftmost = None
         
         if not self.is_empty:
             # restore root BACK to BLACK
@@ -472,6 +701,7 @@ class RedBlackBST:
             subtree = self._rotate_right(subtree)
             
         if subtree.right is None:
+            subtree.free()
             return None
         
         if not self.is_red(subtree.right) and \
@@ -494,6 +724,7 @@ class RedBlackBST:
             self.root.color = RedBlackBST.RED
         
         self.root = self._del_key(k, self.root)
+        self._leftmost = None
         
         if not self.is_empty:
             # restore root BACK to BLACK
@@ -544,6 +775,7 @@ class RedBlackBST:
         # right child is None, it means we found the node
         # to be deleted. Return None to remove it.
         if k == subtree.key and subtree.right is None:
+            subtree.free()
             return None
         
         # Check if the right child is a 2-node
@@ -580,13 +812,13 @@ class RedBlackBST:
         """
         Does this BST contain the given key?
         """
-        return self.get(k) is not None
+        return self._get(k, self.root) is not None
         
     def size(self):
         """
         Returns the size of the BST.
         """
-        return self._size(self.root)
+        return 0 if self.root is None else self.root.size
             
     def _size(self, subtree):
         """
@@ -598,9 +830,6 @@ class RedBlackBST:
             return subtree.size
  
     def get(self, k):
-        if self.is_empty:
-            return None
-        
         return self._get(k, self.root)
     
     def _get(self, k, subtree):
@@ -639,8 +868,14 @@ class RedBlackBST:
     def min(self):
         """
         Returns the smallest key in the BST.
+
+        The node holding it is cached: `put` replaces it when
+        a smaller key is added and deletions recompute it.
         """
-        smallest = self._min(self.root)
+        if self._leftmost is None:
+            self._leftmost = self._min(self.root)
+
+        smallest = self._leftmost
         if smallest is None:
             return None
         else:
@@ -891,88 +1126,85 @@ class RedBlackBST:
     def display(self, filename='img/red_black_bst', view=True):
         """
         Display tree by rendering it with Graphviz.
+
+        The DOT source is written straight to `filename` while the
+        tree is traversed; Graphviz is only needed at the end, to
+        render it as `filename.png`.
         """
-        dot = graphviz.Digraph()
+        import graphviz
+
+        dirname = os.path.dirname(filename)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+
+        with open(filename, 'w') as dot:
+            self._write_dot(dot)
+
+        rendered = graphviz.render('dot', 'png', filename)
+
+        if view:
+            graphviz.view(rendered)
+
+    def _write_dot(self, dot):
+        """
+        Writes the tree in DOT language to the text stream `dot`,
+        one line per node/edge, in an iterative preorder traversal.
+        """
+        dot.write("digraph {\n")
+
         root = self.root
         if root is None:
-            dot.node("", shape="point")
-            dot.render(filename, view=view, format='png')
+            dot.write('\t"" [shape=point]\n}\n')
             return
-        
+
         root_color = "red" if root.color else "black"
-        dot.node(str(root.key), color=root_color)
+        dot.write(f'\t"{root.key}" [color={root_color}]\n')
 
-        def add_nodes_edges(node):
-            
-            ### LEFT NODE
-            # LINK: Node or null
-            if node.left:
-                left_node = str(node.left.key)
-                shape = "ellipse"
-                weight = "1"
-            else:
-                left_node = "None" + str(random())
-                shape = "point"
-                weight = "2"
-            
-            # EDGE: RED or BLACK
-            if self.is_red(node.left):
-                color = "red"
-                penwidth = "2"
-            else:
-                color = "black"
-                penwidth = "1"
-                
-            dot.node(left_node, shape=shape, color=color)
-            dot.edge(
-                str(node.key),  # node from
-                left_node,      # node to
-                color=color,
-                penwidth=penwidth,
-                weight=weight,
-                )
-            
-            # recursively add more nodes
-            if node.left:
-                add_nodes_edges(node.left)
-            
-            ### RIGHT NODE
-            # LINK: Node or null
-            if node.right:
-                right_node = str(node.right.key)
-                shape = "ellipse"
-                weight = "1"
-            else:
-                right_node = "None" + str(random())
-                shape = "point"
-                weight = "2"
-            
-            # EDGE: RED or BLACK
-            if self.is_red(node.right):
-                color = "red"
-                penwidth = "2"
-            else:
-                color = "black"
-                penwidth = "1"
-                
-            dot.node(right_node, shape=shape, color=color)
-            dot.edge(
-                str(node.key),  # node from
-                right_node,      # node to
-                color=color,
-                penwidth=penwidth,
-                weight=weight,
-                )
-            # recursively add more nodes
+        null_links = 0  # null links get unique node names
+        stack = [root]
+
+        while stack:
+            node = stack.pop()
+
+            for child in (node.left, node.right):
+                # LINK: Node or null
+                if child:
+                    child_name = f'"{child.key}"'
+                    shape = "ellipse"
+                    weight = "1"
+                else:
+                    child_name = f'"None{null_links}"'
+                    null_links += 1
+                    shape = "point"
+                    weight = "2"
+
+                # EDGE: RED or BLACK
+                if self.is_red(child):
+                    color = "red"
+                    penwidth = "2"
+                else:
+                    color = "black"
+                    penwidth = "1"
+
+                dot.write(f'\t{child_name} [color={color} shape={shape}]\n')
+                dot.write(
+                    f'\t"{node.key}" -> {child_name} '
+                    f'[color={color} penwidth={penwidth} weight={weight}]\n'
+                    )
+
+            # push right first, so the left subtree is written first
             if node.right:
-                add_nodes_edges(node.right)
-            
-        add_nodes_edges(root)
-        dot.render(filename, view=view, format='png')
+                stack.append(node.right)
+            if node.left:
+                stack.append(node.left)
+
+        dot.write("}\n")
     
 # ------------------------------------------------
 #   TESTS
 # ------------------------------------------------
+import io
+import sys
 import unittest
 from random import randint, choice
 
@@ -983,6 +1215,10 @@ class TestsRedBlackBST(unittest.TestCase):
         # for display testing: open the rendered image
         self.view = False
         
+    def assertNode(self, node, key, val, size, color):
+        self.assertEqual((key, val, size, color),
+                         (node.key, node.val, node.size, node.color))
+
     def test_is_BST_empty_tree(self):
         self.assertTrue(self.bst.is_BST)
     
@@ -1035,6 +1271,22 @@ class TestsRedBlackBST(unittest.TestCase):
         root.size = 4
         self.assertFalse(self.bst.is_size_consistent)
         
+    def test_integrity_checks_on_deep_tree(self):
+        # a degenerate (non red-black) tree deeper than the
+        # recursion limit: checks must not raise RecursionError
+        depth = 2 * sys.getrecursionlimit()
+        node = None
+        for key in range(depth):
+            left = node
+            node = self.bst._Node(key, key, size=key + 1, color=False)
+            node.left = left
+        self.bst.root = node
+
+        self.assertTrue(self.bst.is_BST)
+        self.assertTrue(self.bst.is_size_consistent)
+        self.assertTrue(self.bst.is_23tree)
+        self.assertFalse(self.bst.is_balanced)
+
     def test_is_size_consistent(self):
         root = self.bst.root = self.bst._Node(3, 'a')
         self.assertTrue(self.bst.is_size_consistent)
@@ -1304,6 +1556,16 @@ class TestsRedBlackBST(unittest.TestCase):
         root.left = self.bst._Node(3, 'c', color=True)
         self.assertFalse(self.bst._flip_colors(self.bst.root))
         
+    def test_flip_colors_leaves_colors_unchanged(self):
+        # red parent, black and red children: no flip
+        self.bst.root = root = self.bst._Node(5, 'a', color=True)
+        root.left = self.bst._Node(3, 'c', color=False)
+        root.right = self.bst._Node(7, 'b', color=True)
+        self.assertIs(False, self.bst._flip_colors(root))
+        self.assertTrue(root.color)
+        self.assertFalse(root.left.color)
+        self.assertTrue(root.right.color)
+
     def test_flip_colors_same_color_parent_child(self):
         # all black
         self.bst.root = root = self.bst._Node(5, 'a', color=False)
@@ -1350,18 +1612,15 @@ class TestsRedBlackBST(unittest.TestCase):
         bst.put(5, 5)
         bst.put(3, 3)
         bst.assert_integrity()
-        expected_node = bst._Node(3, 3, color=True, size=1)
-        self.assertEqual(expected_node, bst.root.left)
+        self.assertNode(bst.root.left, 3, 3, size=1, color=True)
         
     def test_put_right(self):
         bst = self.bst
         bst.put(5, 5)
         bst.put(7, 7)
         bst.assert_integrity()
-        expected_root = bst._Node(7, 7, color=False, size=2)
-        expected_left = bst._Node(5, 5, color=True, size=1)
-        self.assertEqual(expected_root, bst.root)
-        self.assertEqual(expected_left, bst.root.left)
+        self.assertNode(bst.root, 7, 7, size=2, color=False)
+        self.assertNode(bst.root.left, 5, 5, size=1, color=True)
         
     def test_put(self):
         bst = self.bst
@@ -1370,7 +1629,92 @@ class TestsRedBlackBST(unittest.TestCase):
         bst.put(7, "cherry")
         bst.put(4, "date")
         bst.assert_integrity()
-    
+
+    def test_put_two_red_children_are_not_rotated(self):
+        bst = self.bst
+        bst.put(2, 2)
+        bst.put(1, 1)
+        bst.put(3, 3)
+        #    (2)
+        #   /   \
+        # (1)   (3)
+        self.assertNode(bst.root, 2, 2, size=3, color=False)
+        self.assertNode(bst.root.left, 1, 1, size=1, color=False)
+        self.assertNode(bst.root.right, 3, 3, size=1, color=False)
+
+        bst.put(4, 4)
+        #    (2)
+        #   /   \
+        # (1)   (4)
+        #       //
+        #     (3)
+        self.assertNode(bst.root, 2, 2, size=4, color=False)
+        self.assertNode(bst.root.left, 1, 1, size=1, color=False)
+        self.assertNode(bst.root.right, 4, 4, size=2, color=False)
+        self.assertNode(bst.root.right.left, 3, 3, size=1, color=True)
+        self.assertTrue(bst.assert_integrity())
+
+    def test_put_ascending_and_descending_keys(self):
+        for key in range(500):
+            self.bst.put(key, str(key))
+        for key in range(-1, -500, -1):
+            self.bst.put(key, str(key))
+
+        self.assertTrue(self.bst.assert_integrity())
+        self.assertEqual(999, self.bst.size())
+        self.assertEqual(list(range(-499, 500)), self.bst.keys())
+
+    def test_from_sorted_empty(self):
+        bst = RedBlackBST.from_sorted([])
+        self.assertTrue(bst.is_empty)
+        self.assertTrue(bst.assert_integrity())
+
+    def test_from_sorted(self):
+        for n in range(1, 100):
+            pairs = [(key, str(key)) for key in range(n)]
+            bst = RedBlackBST.from_sorted(pairs)
+            self.assertTrue(bst.assert_integrity())
+            self.assertEqual(n, bst.size())
+            self.assertEqual(list(range(n)), bst.keys())
+            self.assertEqual(str(n - 1), bst.get(n - 1))
+
+        # still a valid red-black BST after further updates
+        bst.put(-1, "-1")
+        bst.del_key(50)
+        self.assertTrue(bst.assert_integrity())
+
+    def test_from_sorted_not_sorted(self):
+        with self.assertRaises(ValueError):
+            RedBlackBST.from_sorted([(2, 'b'), (1, 'a')])
+
+        with self.assertRaises(ValueError):
+            RedBlackBST.from_sorted([(1, 'a'), (1, 'b')])
+
+    def test_deleted_nodes_are_reused(self):
+        self.bst.put('a', 'apple')
+        self.bst.put('b', 'banana')
+        deleted = self.bst.root.left
+        self.bst.del_min()
+        self.assertIsNone(deleted.key)
+        self.assertIs(deleted, RedBlackBST._Node._pool[-1])
+
+        self.bst.put('c', 'cherry')
+        #    (c)
+        #   //  \
+        # (b)
+        self.assertIs(deleted, self.bst.root)
+        self.assertEqual('cherry', deleted.val)
+        self.assertTrue(self.bst.assert_integrity())
+
+    def test_freeze(self):
+        bst = RedBlackBST.from_sorted((key, key) for key in range(100))
+        bst.freeze()
+        self.addCleanup(gc.unfreeze)
+        self.assertGreaterEqual(gc.get_freeze_count(), bst.size())
+
+        bst.put(100, 100)
+        self.assertTrue(bst.assert_integrity())
+
     def test_del_min_empty_tree(self):
         with self.assertRaises(KeyError):
             self.bst.del_min()
@@ -1569,16 +1913,37 @@ class TestsRedBlackBST(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.bst._Node('a', 'a', color = 'blue')
     
+    def test_Node_size_and_color(self):
+        node = self.bst._Node('a', 'apple', size=3, color=False)
+        node.color = True
+        self.assertEqual(3, node.size)
+        self.assertIs(True, node.color)
+        node.size = 7
+        self.assertEqual(7, node.size)
+        self.assertIs(True, node.color)
+        node.color = False
+        self.assertEqual(7, node.size)
+        self.assertIs(False, node.color)
+
+    def test_Node_children(self):
+        node = self.bst._Node('b', 'banana')
+        left = node.left = self.bst._Node('a', 'apple')
+        right = node.right = self.bst._Node('c', 'cherry')
+        self.assertEqual([left, right], node.c)
+        self.assertIs(left, node.c[LEFT])
+        self.assertIs(right, node.c[RIGHT])
+
     def test_Node_repr(self):
         node = self.bst._Node('a', 'apple', size = 3, color = False)
         expected = "_Node(key=a, val=apple, size=3, color=BLACK)"
         self.assertEqual(expected, node.__repr__())
             
-    def test_Node_eq(self):
+    def test_Node_eq_is_identity(self):
         node1 = self.bst._Node('a', 'apple', size = 3, color = False)
         node2 = self.bst._Node('a', 'apple', size = 3, color = False)
-        self.assertIsNot(node1, node2)
-        self.assertEqual(node1, node2)
+        self.assertEqual(node1, node1)
+        self.assertNotEqual(node1, node2)
+        self.assertEqual(2, len({node1, node2, node1}))
             
     def test_Node_not_eq(self):
         node1 = self.bst._Node('a', 'apple', size = 3, color = False)
@@ -1586,12 +1951,12 @@ class TestsRedBlackBST(unittest.TestCase):
         self.assertIsNot(node1, node2)
         self.assertNotEqual(node1, node2)
             
-    def test_Node_eq_type_error(self):
+    def test_Node_eq_other_type(self):
         node1 = self.bst._Node('a', 'apple')
         node2 = 'a'
         self.assertIsNot(node1, node2)
-        with self.assertRaises(TypeError):
-            node1 == node2
+        self.assertNotEqual(node1, node2)
+        self.assertNotEqual(node2, node1)
     
     def test_min_empty_tree(self):
         self.assertIsNone(self.bst.min())
@@ -1612,6 +1977,24 @@ class TestsRedBlackBST(unittest.TestCase):
         self.bst.put(1, "eggplant")
         self.assertEqual(1, self.bst.min())
         
+    def test_min_after_deletions(self):
+        keys = [randint(0, 1_000) for _ in range(100)]
+        for key in keys:
+            self.bst.put(key, str(key))
+
+        keys = sorted(set(keys))
+        while keys:
+            self.assertEqual(keys[0], self.bst.min())
+            if randint(0, 1):
+                self.bst.del_min()
+                keys.pop(0)
+            else:
+                key = choice(keys)
+                self.bst.del_key(key)
+                keys.remove(key)
+
+        self.assertIsNone(self.bst.min())
+
     def test_max_empty_tree(self):
         self.assertIsNone(self.bst.max())
         
@@ -1837,6 +2220,27 @@ class TestsRedBlackBST(unittest.TestCase):
         self.bst.put('f', 'fig')
         self.bst.put('g', 'guava')
         self.bst.display('img/test_display', view=self.view)
+
+    def test_write_dot_empty(self):
+        dot = io.StringIO()
+        self.bst._write_dot(dot)
+        self.assertEqual('digraph {\n\t"" [shape=point]\n}\n', dot.getvalue())
+
+    def test_write_dot(self):
+        self.bst.put('a', 'apple')
+        self.bst.put('b', 'banana')
+        #    (b)
+        #   //  \
+        # (a)
+        dot = io.StringIO()
+        self.bst._write_dot(dot)
+        lines = dot.getvalue().splitlines()
+        self.assertEqual('digraph {', lines[0])
+        self.assertEqual('\t"b" [color=black]', lines[1])
+        self.assertIn('\t"b" -> "a" [color=red penwidth=2 weight=1]', lines)
+        # 2 lines (node + edge) per link, 2 links per node
+        self.assertEqual(2 + 2 * 2 * 2 + 1, len(lines))
+        self.assertEqual('}', lines[-1])
     
     def test_move_red_left_empty_tree(self):
         self.assertIsNone(self.bst._move_red_left(self.bst.root))
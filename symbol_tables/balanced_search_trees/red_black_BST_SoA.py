@@ -0,0 +1,557 @@
+from array import array
+
+RED = 1
+BLACK = 0
+NULL = -1   # index of null links
+
+
+# Red-black helpers: plain functions on the arrays and node indices,
+# so that `_put_iter` runs on integers and arrays only, with no
+# attribute lookups on the tree.
+
+def _size(sc, i):
+    return 0 if i == NULL else sc[i] >> 1
+
+
+def _is_red(sc, i):
+    return i != NULL and sc[i] & 1 == 1
+
+
+def _rotate_left(left, right, sc, h):
+    """
+    Orient a (temporarily) right-leaning red link to lean left.
+    See `RedBlackBST._rotate_left`.
+    """
+    x = right[h]
+    right[h] = left[x]
+    left[x] = h
+    sc[x] = sc[h]
+    size = 1 + _size(sc, left[h]) + _size(sc, right[h])
+    sc[h] = size << 1 | RED
+
+    return x
+
+
+def _rotate_right(left, right, sc, h):
+    """
+    Orient a left-leaning red link to the right.
+    See `RedBlackBST._rotate_right`.
+    """
+    x = left[h]
+    left[h] = right[x]
+    right[x] = h
+    sc[x] = sc[h]
+    size = 1 + _size(sc, left[h]) + _size(sc, right[h])
+    sc[h] = size << 1 | RED
+
+    return x
+
+
+def _restore_balance(left, right, sc, h):
+    """
+    See `RedBlackBST.restore_balance`.
+    """
+    left_red = _is_red(sc, left[h])
+    right_red = _is_red(sc, right[h])
+
+    if left_red or right_red:
+        # right-leaning red link
+        if right_red and not left_red:
+            h = _rotate_left(left, right, sc, h)
+
+        # two consecutives left-leaning red links
+        if _is_red(sc, left[h]) and _is_red(sc, left[left[h]]):
+            h = _rotate_right(left, right, sc, h)
+
+        # two red children: flip colors
+        if _is_red(sc, left[h]) and _is_red(sc, right[h]):
+            sc[h] ^= 1
+            sc[left[h]] ^= 1
+            sc[right[h]] ^= 1
+
+    # update sizes
+    size = 1 + _size(sc, left[h]) + _size(sc, right[h])
+    sc[h] = size << 1 | sc[h] & 1
+
+    return h
+
+
+def _put_iter(keys, left, right, sc, root, k):
+    """
+    Inserts `k` into the tree rooted at `root`.
+
+    Returns the (new) root and the index of the node holding `k`:
+    either the existing one, or a new one appended at the end
+    of the arrays, i.e. at index `len(keys) - 1`.
+    """
+    # (1) puts new node just like a normal BST
+    path = []
+    h = root
+
+    while h != NULL:
+        key = keys[h]
+
+        if k == key:
+            return root, h
+
+        path.append(h)
+        h = left[h] if k < key else right[h]
+
+    i = h = len(keys)
+    keys.append(k)
+    left.append(NULL)
+    right.append(NULL)
+    sc.append(1 << 1 | RED)
+
+    # (2) walk the path back up, fixing-up color links
+    for parent in reversed(path):
+        if k < keys[parent]:
+            left[parent] = h
+        else:
+            right[parent] = h
+
+        h = _restore_balance(left, right, sc, parent)
+
+    sc[h] &= ~1     # root is always BLACK
+
+    return h, i
+
+
+class RedBlackBSTSoA:
+    """
+    # Left-leaning red-black BST, as a structure of arrays (SoA)
+
+    Same symbol table as `RedBlackBST`, but there is no `_Node`
+    object graph: a node is just an index `i` into parallel arrays
+
+        keys[i], vals[i]    its key and value
+        left[i], right[i]   the indices of its children
+        sc[i]               its size and color, packed as in
+                            `RedBlackBST._Node`: `size << 1 | color`
+
+    and null links are `NULL`.
+
+    Links and sizes live in contiguous arrays of machine ints,
+    so following a link is an array read instead of an attribute
+    lookup on a separate Python object per node. Arrays grow on
+    demand, like any Python list/array (amortized doubling).
+
+    Meant for large, read-mostly trees: it supports insertion
+    and the read operations, but not deletion.
+    """
+
+    RED = RED
+    BLACK = BLACK
+
+    def __init__(self):
+        self.root = NULL
+        self.keys = []
+        self.vals = []
+        self.left = array('l')
+        self.right = array('l')
+        self.sc = array('l')
+
+    @classmethod
+    def from_sorted(cls, pairs):
+        """
+        Builds a tree from `(key, value)` pairs given in strictly
+        ascending key order, in linear time.
+
+        Same 2-3 tree layout as `RedBlackBST.from_sorted`, so both
+        build the same tree from the same pairs.
+        """
+        items = list(pairs)
+
+        for i in range(1, len(items)):
+            if not items[i - 1][0] < items[i][0]:
+                raise ValueError("Keys must be in strictly ascending order.")
+
+        bst = cls()
+        n = len(items)
+        bst.root = bst._build(items, 0, n, (n + 1).bit_length() - 1)
+
+        return bst
+
+    def _build(self, items, lo, hi, height):
+        """
+        Builds a subtree of black height `height` from `items[lo:hi]`
+        and returns the index of its (BLACK) root.
+        See `RedBlackBST._build`.
+        """
+        if height == 0:
+            return NULL
+
+        left, right = self.left, self.right
+        count = hi - lo
+        child_max = 3 ** (height - 1) - 1
+
+        # 2-node
+        if count - 1 <= 2 * child_max:
+            mid = lo + (count - 1) // 2
+            h = self._new_node(*items[mid], count, BLACK)
+            left[h] = self._build(items, lo, mid, height - 1)
+            right[h] = self._build(items, mid + 1, hi, height - 1)
+            return h
+
+        # 3-node: (red_left) < (h)
+        rest = count - 2
+        mid_left = lo + rest // 3
+        mid_right = mid_left + 1 + (rest - rest // 3) // 2
+
+        red_left = self._new_node(*items[mid_left], mid_right - lo, RED)
+        left[red_left] = self._build(items, lo, mid_left, height - 1)
+        right[red_left] = self._build(items, mid_left + 1, mid_right,
+                                      height - 1)
+
+        h = self._new_node(*items[mid_right], count, BLACK)
+        left[h] = red_left
+        right[h] = self._build(items, mid_right + 1, hi, height - 1)
+
+        return h
+
+    def _new_node(self, k, v, size, color):
+        """
+        Appends a node with no children and returns its index.
+        """
+        self.keys.append(k)
+        self.vals.append(v)
+        self.left.append(NULL)
+        self.right.append(NULL)
+        self.sc.append(size << 1 | color)
+
+        return len(self.keys) - 1
+
+    def compact(self):
+        """
+        Renumbers the nodes in level order (BFS): the root is node 0,
+        followed by its children, then its grandchildren, etc.
+
+        Nodes are otherwise numbered in insertion order, so a search
+        jumps all over the arrays; in level order the top levels,
+        which every search goes through, sit together at the start
+        of the arrays and siblings are stored next to each other.
+        Meant to be called once a tree is done with insertions.
+        """
+        if self.is_empty:
+            return
+
+        left, right = self.left, self.right
+
+        # old indices, in level order
+        order = [self.root]
+        for i in order:     # grows while iterating
+            if left[i] != NULL:
+                order.append(left[i])
+            if right[i] != NULL:
+                order.append(right[i])
+
+        new_index = array('l', [NULL]) * len(order)
+        for new, old in enumerate(order):
+            new_index[old] = new
+
+        self.keys = [self.keys[i] for i in order]
+        self.vals = [self.vals[i] for i in order]
+        self.left = array('l', (NULL if left[i] == NULL else new_index[left[i]]
+                                for i in order))
+        self.right = array('l', (NULL if right[i] == NULL
+                                 else new_index[right[i]] for i in order))
+        self.sc = array('l', (self.sc[i] for i in order))
+        self.root = 0
+
+    # ------------------------------------------------
+    #   Red-black helpers, on node indices.
+    # ------------------------------------------------
+    def is_red(self, i):
+        """
+        Is node `i` RED?
+        By default, null links are BLACK.
+        """
+        return _is_red(self.sc, i)
+
+    def _size(self, i):
+        """
+        Returns the size of the subtree rooted at node `i`.
+        """
+        return _size(self.sc, i)
+
+    # ------------------------------------------------
+    #   Symbol table API.
+    # ------------------------------------------------
+    @property
+    def is_empty(self):
+        return self.root == NULL
+
+    def size(self):
+        """
+        Returns the size of the BST.
+        """
+        return self._size(self.root)
+
+    def put(self, k, v):
+        """
+        Inserts the key-value pair: same iterative algorithm
+        as `RedBlackBST.put`, on node indices (see `_put_iter`).
+        """
+        vals = self.vals
+        self.root, i = _put_iter(self.keys, self.left, self.right,
+                                 self.sc, self.root, k)
+
+        if i == len(vals):  # new node
+            vals.append(v)
+        else:
+            vals[i] = v
+
+    def get(self, k):
+        """
+        Returns the value associated with `k`, or None.
+        """
+        keys, left, right = self.keys, self.left, self.right
+        h = self.root
+
+        while h != NULL:
+            key = keys[h]
+
+            if k == key:
+                return self.vals[h]
+
+            h = left[h] if k < key else right[h]
+
+        return None
+
+    def contains(self, k):
+        """
+        Does this BST contain the given key?
+        """
+        return self.get(k) is not None
+
+    def min(self):
+        """
+        Returns the smallest key in the BST.
+        """
+        if self.is_empty:
+            return None
+
+        left = self.left
+        h = self.root
+        while left[h] != NULL:
+            h = left[h]
+
+        return self.keys[h]
+
+    def max(self):
+        """
+        Returns the LARGEST key in the BST.
+        """
+        if self.is_empty:
+            return None
+
+        right = self.right
+        h = self.root
+        while right[h] != NULL:
+            h = right[h]
+
+        return self.keys[h]
+
+    def keys_in_order(self, lo=None, hi=None):
+        """
+        Returns all keys in the BST between `lo` (inclusive) and
+        `hi` (also inclusive) in ascending order.
+
+        Same as `RedBlackBST.keys` (the name `keys` is taken by
+        the keys array).
+        """
+        if self.is_empty:
+            return []
+        if lo is None:
+            lo = self.min()
+        if hi is None:
+            hi = self.max()
+
+        keys, left, right = self.keys, self.left, self.right
+        q = []      # queue
+        stack = []
+        h = self.root
+
+        while True:
+            # go down the left spine, skipping keys smaller than `lo`
+            while h != NULL:
+                if keys[h] < lo:
+                    h = right[h]
+                else:
+                    stack.append(h)
+                    h = left[h]
+
+            if not stack:
+                return q
+
+            h = stack.pop()
+
+            if keys[h] > hi:
+                return q
+
+            q.append(keys[h])
+            h = right[h]
+
+
+# ------------------------------------------------
+#   TESTS
+# ------------------------------------------------
+import unittest
+from random import randint
+
+from red_black_BST import RedBlackBST
+
+
+class TestsRedBlackBSTSoA(unittest.TestCase):
+    def setUp(self):
+        self.bst = RedBlackBSTSoA()
+
+    def assertSameTree(self, soa, rb):
+        """
+        Asserts that `soa` has the exact shape, colors and sizes of
+        the `RedBlackBST` `rb`.
+        """
+        stack = [(soa.root, rb.root)]
+
+        while stack:
+            i, node = stack.pop()
+
+            if node is None:
+                self.assertEqual(NULL, i)
+                continue
+
+            self.assertEqual(node.key, soa.keys[i])
+            self.assertEqual(node.val, soa.vals[i])
+            self.assertEqual(node.size, soa._size(i))
+            self.assertEqual(node.color, soa.is_red(i))
+
+            stack.append((soa.left[i], node.left))
+            stack.append((soa.right[i], node.right))
+
+    def test_empty_tree(self):
+        self.assertTrue(self.bst.is_empty)
+        self.assertEqual(0, self.bst.size())
+        self.assertIsNone(self.bst.get(1))
+        self.assertIsNone(self.bst.min())
+        self.assertIsNone(self.bst.max())
+        self.assertEqual([], self.bst.keys_in_order())
+
+    def test_put_and_get(self):
+        self.bst.put(5, "apple")
+        self.bst.put(2, "banana")
+        self.bst.put(7, "cherry")
+        self.assertEqual("banana", self.bst.get(2))
+        self.assertTrue(self.bst.contains(7))
+        self.assertFalse(self.bst.contains(9))
+        self.assertEqual(3, self.bst.size())
+
+    def test_put_existing_key(self):
+        self.bst.put(5, 5)
+        self.bst.put(5, 10)
+        self.assertEqual(1, self.bst.size())
+        self.assertEqual(10, self.bst.get(5))
+
+    def test_put_iter(self):
+        keys, left, right, sc = [], array('l'), array('l'), array('l')
+
+        root, i = _put_iter(keys, left, right, sc, NULL, 'b')
+        self.assertEqual((0, 0), (root, i))
+        root, i = _put_iter(keys, left, right, sc, root, 'a')
+        self.assertEqual((0, 1), (root, i))
+        root, i = _put_iter(keys, left, right, sc, root, 'c')
+        self.assertEqual((0, 2), (root, i))
+
+        # existing key: same root, no new node
+        self.assertEqual((0, 1), _put_iter(keys, left, right, sc, root, 'a'))
+        self.assertEqual(3, len(keys))
+
+    def test_from_sorted(self):
+        for n in range(100):
+            pairs = [(key, str(key)) for key in range(n)]
+            bst = RedBlackBSTSoA.from_sorted(pairs)
+
+            self.assertEqual(n, bst.size())
+            self.assertEqual(list(range(n)), bst.keys_in_order())
+            self.assertSameTree(bst, RedBlackBST.from_sorted(pairs))
+
+        # and the built tree still takes insertions
+        bst.put(-1, '-1')
+        self.assertEqual('-1', bst.get(-1))
+        self.assertEqual(n + 1, bst.size())
+
+    def test_from_sorted_not_sorted(self):
+        with self.assertRaises(ValueError):
+            RedBlackBSTSoA.from_sorted([(2, 'b'), (1, 'a')])
+
+    def test_compact_empty_tree(self):
+        self.bst.compact()
+        self.assertTrue(self.bst.is_empty)
+
+    def test_compact(self):
+        rb = RedBlackBST()
+
+        for _ in range(300):
+            key = randint(0, 1_000)
+            self.bst.put(key, str(key))
+            rb.put(key, str(key))
+
+        bst = self.bst
+        bst.compact()
+
+        self.assertEqual(0, bst.root)
+        self.assertSameTree(bst, rb)
+
+        # level order: children are numbered in the order they
+        # are met, i.e. consecutively across each level
+        children = [i for node in range(bst.size())
+                    for i in (bst.left[node], bst.right[node]) if i != NULL]
+        self.assertEqual(list(range(1, bst.size())), children)
+
+        # still a working tree
+        bst.put(-1, '-1')
+        rb.put(-1, '-1')
+        self.assertSameTree(bst, rb)
+
+    def test_same_tree_as_red_black_BST(self):
+        rb = RedBlackBST()
+
+        for _ in range(500):
+            key = randint(0, 1_000)
+            self.bst.put(key, str(key))
+            rb.put(key, str(key))
+
+        self.assertSameTree(self.bst, rb)
+
+    def test_same_tree_ascending_keys(self):
+        rb = RedBlackBST()
+
+        for key in 'abcdefghijklmnopqrstuvwxyz':
+            self.bst.put(key, key.upper())
+            rb.put(key, key.upper())
+
+        self.assertSameTree(self.bst, rb)
+        self.assertFalse(self.bst.is_red(self.bst.root))
+
+    def test_min_max(self):
+        keys = [randint(0, 1_000) for _ in range(100)]
+        for key in keys:
+            self.bst.put(key, key)
+
+        self.assertEqual(min(keys), self.bst.min())
+        self.assertEqual(max(keys), self.bst.max())
+
+    def test_keys_in_order(self):
+        bst = self.bst
+        for key in [5, 2, 7, 6, 1, 8]:
+            bst.put(key, str(key))
+
+        self.assertEqual([1, 2, 5, 6, 7, 8], bst.keys_in_order())
+        self.assertEqual([1], bst.keys_in_order(1, 1))
+        self.assertEqual([7, 8], bst.keys_in_order(7, 10))
+        self.assertEqual([2, 5, 6, 7], bst.keys_in_order(2, 7))
+        self.assertEqual([1, 2, 5, 6, 7, 8], bst.keys_in_order(0, 10))
+        self.assertEqual([], bst.keys_in_order(3, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
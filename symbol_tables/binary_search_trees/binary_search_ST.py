@@ -0,0 +1,250 @@
+from bisect import bisect_left, bisect_right
+
+
+class BinarySearchST:
+    """
+    # Binary search symbol table
+
+    Ordered symbol table with the same API as `BST`, but keys and
+    values are kept in two parallel lists, in ascending key order,
+    and searched by binary search (`bisect`):
+
+        keys:   [ A | C | E | H | R | S | X ]
+        vals:   [ 1 | 2 | 3 | 4 | 5 | 6 | 7 ]
+
+    - `get`, `contains`, floor, ceiling and rank: binary search,
+    O(log n), run by `bisect` in C over a contiguous list instead of
+    a Python-level walk down node links;
+
+    - min and max: the first and last keys, O(1);
+
+    - `put` of a new key and deletions shift the keys after it,
+    O(n) in the worst case (but a `memmove` of pointers, fast
+    for tables that are read much more than written).
+    """
+
+    def __init__(self):
+        self._keys = []     # in ascending order
+        self._vals = []     # `_vals[i]` is the value of `_keys[i]`
+
+    @property
+    def is_empty(self):
+        """
+        Returns `True` if the table is empty, `False` otherwise.
+        """
+        return not self._keys
+
+    def size(self):
+        """
+        Returns the number of keys in the table.
+        """
+        return len(self._keys)
+
+    def get(self, k, default=None):
+        """
+        Returns the value associated with the given key `k`.
+
+        If `k` is not in the table, return `default` (None unless
+        given), as `BST.get`.
+        """
+        keys = self._keys
+        i = bisect_left(keys, k)
+
+        if i < len(keys) and keys[i] == k:
+            return self._vals[i]
+
+        return default
+
+    def contains(self, k):
+        """
+        Returns `True` if given key `k` is in the table.
+        `False` otherwise.
+        """
+        return self.get(k) is not None
+
+    def put(self, k, v):
+        """
+        Inserts the specified key-value pair into the table.
+        If the table contains `k`, overwrites the old value with `v`.
+        """
+        keys = self._keys
+        i = bisect_left(keys, k)
+
+        if i < len(keys) and keys[i] == k:
+            self._vals[i] = v
+            return
+
+        keys.insert(i, k)
+        self._vals.insert(i, v)
+
+    def get_max_key(self):
+        return self._keys[-1] if self._keys else None
+
+    def get_min_key(self):
+        return self._keys[0] if self._keys else None
+
+    def get_floor(self, k):
+        """
+        Returns LARGEST key that is less than or equal to `k`.
+        """
+        i = bisect_right(self._keys, k)
+        return self._keys[i - 1] if i > 0 else None
+
+    def get_ceiling(self, k):
+        """
+        Returns smallest key that is greater than or equal to `k`.
+        """
+        i = bisect_left(self._keys, k)
+        return self._keys[i] if i < len(self._keys) else None
+
+    def keys(self, lo=None, hi=None):
+        """
+        Returns all keys in the table between `lo` (inclusive) and
+        `hi` (also inclusive) in ascending order, as `BST.keys`.
+        If `lo` or `hi` is not given, the range is open on that side.
+
+        Two binary searches for the ends of the range, then a slice.
+        """
+        keys = self._keys
+        i = 0 if lo is None else bisect_left(keys, lo)
+        j = len(keys) if hi is None else bisect_right(keys, hi)
+        return keys[i:j]
+
+    def __iter__(self):
+        """
+        Iterates over the keys in ascending order.
+        """
+        return iter(self._keys)
+
+    def get_rank(self, k):
+        """
+        Returns the number of keys less than or equal to `k`,
+        as `BST.get_rank`.
+        """
+        return bisect_right(self._keys, k)
+
+    def del_max(self):
+        """
+        Removes the largest key from the table.
+        """
+        if self.is_empty:
+            raise KeyError("Symbol table is empty.")
+
+        self._keys.pop()
+        self._vals.pop()
+
+    def del_min(self):
+        """
+        Removes the smallest key from the table.
+        """
+        if self.is_empty:
+            raise KeyError("Symbol table is empty.")
+
+        del self._keys[0]
+        del self._vals[0]
+
+    def del_key(self, k):
+        """
+        Removes the given key `k` (and its value) from the table.
+        """
+        keys = self._keys
+        i = bisect_left(keys, k)
+
+        if i == len(keys) or keys[i] != k:
+            raise KeyError(f"This symbol table does not contain `{k}`.")
+
+        del keys[i]
+        del self._vals[i]
+
+# ------------------------------------------------------------------------
+# TESTS
+# ------------------------------------------------------------------------
+import unittest
+from random import randint
+
+from bst import BST
+
+
+class TestsBinarySearchST(unittest.TestCase):
+    def setUp(self) -> None:
+        self.st = BinarySearchST()
+
+    def test_empty_table(self):
+        self.assertTrue(self.st.is_empty)
+        self.assertEqual(0, self.st.size())
+        self.assertIsNone(self.st.get(1))
+        self.assertEqual("none", self.st.get(1, "none"))
+        self.assertEqual([], self.st.keys())
+        self.assertEqual([], list(self.st))
+        self.assertIsNone(self.st.get_min_key())
+        self.assertIsNone(self.st.get_max_key())
+        self.assertIsNone(self.st.get_floor(1))
+        self.assertIsNone(self.st.get_ceiling(1))
+        self.assertEqual(0, self.st.get_rank(1))
+
+        with self.assertRaises(KeyError):
+            self.st.del_min()
+        with self.assertRaises(KeyError):
+            self.st.del_max()
+        with self.assertRaises(KeyError):
+            self.st.del_key(1)
+
+    def test_put_and_get(self):
+        self.st.put(5, "apple")
+        self.st.put(2, "banana")
+        self.st.put(7, "cherry")
+        self.st.put(2, "date")
+
+        self.assertEqual(3, self.st.size())
+        self.assertEqual("date", self.st.get(2))
+        self.assertTrue(self.st.contains(7))
+        self.assertFalse(self.st.contains(4))
+        self.assertEqual([2, 5, 7], self.st.keys())
+
+    def test_deletions(self):
+        for key in [50, 70, 30, 10, 80, 40]:
+            self.st.put(key, str(key))
+
+        self.st.del_min()
+        self.st.del_max()
+        self.st.del_key(50)
+
+        self.assertEqual([30, 40, 70], self.st.keys())
+        self.assertEqual(["30", "40", "70"], self.st._vals)
+
+        with self.assertRaises(KeyError):
+            self.st.del_key(50)
+
+    def test_same_answers_as_BST(self):
+        bst = BST()
+
+        for _ in range(500):
+            key = randint(0, 1_000)
+            self.st.put(key, str(key))
+            bst.put(key, str(key))
+
+        for _ in range(100):
+            key = randint(0, 1_000)
+            if bst.contains(key):
+                self.st.del_key(key)
+                bst.del_key(key)
+
+        self.assertEqual(bst.size(), self.st.size())
+        self.assertEqual(bst.get_min_key(), self.st.get_min_key())
+        self.assertEqual(bst.get_max_key(), self.st.get_max_key())
+        self.assertEqual(bst.keys(), self.st.keys())
+        self.assertEqual(list(bst), list(self.st))
+        self.assertEqual(bst.keys(lo=250), self.st.keys(lo=250))
+        self.assertEqual(bst.keys(hi=750), self.st.keys(hi=750))
+
+        for k in range(-1, 1_002):
+            self.assertEqual(bst.get(k), self.st.get(k))
+            self.assertEqual(bst.get_floor(k), self.st.get_floor(k))
+            self.assertEqual(bst.get_ceiling(k), self.st.get_ceiling(k))
+            self.assertEqual(bst.get_rank(k), self.st.get_rank(k))
+            self.assertEqual(bst.get(k, -1), self.st.get(k, -1))
+            self.assertEqual(bst.keys(k, k + 50), self.st.keys(k, k + 50))
+
+
+if __name__ == "__main__":
+    unittest.main()
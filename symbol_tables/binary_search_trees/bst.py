@@ -56,20 +56,34 @@ class BST:
     Size        : subtree counts, i.e. Node count
     Rank        : how many keys are less than a given key
     Delete      : lazy deletion, del the minimum, Hibbard deletion
-    Ordered iteration :
+    Ordered iteration : in-order walk (`__iter__`, `keys`)
     """
 
-    def __init__(self):
+    def __init__(self, key=None):
+        """
+        `key`, if given, is a function of one argument mapping each key
+        to a cheaper value compared first in searches, e.g. an int for
+        string keys (`int.from_bytes(s.encode()[:8].ljust(8, b'\0'), 'big')`,
+        their first 8 bytes). It must be non-decreasing: `a < b` implies
+        `key(a) <= key(b)`. Keys with equal `key` values (e.g. strings
+        sharing their first 8 bytes) are told apart by comparing the
+        keys themselves.
+        """
         self.root = None
+        self._key = key
+        self._eytzinger = None  # (sort keys, keys, vals) laid out by `freeze`
+        self._sized = False     # are node sizes kept up to date?
 
     class _Node:
-        def __init__(self, key, value, left=None, right=None, parent=None):
+        __slots__ = ('key', 'val', 'sort_key', 'left', 'right', 'size')
+
+        def __init__(self, key, value, left=None, right=None, sort_key=None):
             self.key = key
             self.val = value
+            self.sort_key = key if sort_key is None else sort_key
             self.left = left
             self.right = right
             self.size = 1  # subtree size with this node as root
-            self.parent = parent
 
         def __repr__(self) -> str:
             return str(self.key)
@@ -79,27 +93,26 @@ class BST:
         """
         Returns `True` if the BST is empty, `False` otherwise.
         """
-        return self._size(self.root) == 0
+        return self.root is None
 
     def size(self, k=None):
         """
         Returns the size of _Node at `k`.
         If `k` is not given, returns size of the root, i.e. entire tree size.
         """
-        if k is None:
-            return self._size(self.root)
+        if not self._sized:
+            self._update_sizes()
 
-        node = self._get_node_at(k)
-        return self._size(node)
+        node = self.root if k is None else self._get_node_at(k)
+        return 0 if node is None else node.size
 
-    def _size(self, node):
+    def _sort_key(self, k):
         """
-        Returns the size of the subtree rooted at given _Node `node`.
+        Returns the sort key of `k`: `k` itself, unless the BST was
+        given a `key` function, then the pair `(key(k), k)`, so that
+        `k` itself only gets compared when `key(k)` ties.
         """
-        if node is None:
-            return 0
-
-        return node.size
+        return k if self._key is None else (self._key(k), k)
 
     def _get_node_at(self, k):
         """
@@ -107,28 +120,58 @@ class BST:
 
         If the BST does not contain `k`, returns `None`.
         """
+        sk = self._sort_key(k)
         node = self.root
+        best = None
 
+        # a single `<` per level: instead of stopping at `k`, go down
+        # to a null link remembering the last node with key <= `k`
+        # (as in `get_floor`), then test that one for equality.
         while node is not None:
-            if k < node.key:
+            if sk < node.sort_key:
                 node = node.left
-            elif k > node.key:
-                node = node.right
             else:
-                return node
+                best = node
+                node = node.right
+
+        if best is not None and best.sort_key == sk:
+            return best
 
         return None
 
-    def get(self, k):
+    def get(self, k, default=None):
         """
         Returns the value associated with the given key `k`.
 
-        If `k` is not in the BST, return None.
+        If `k` is not in the BST, return `default` (None unless
+        given): e.g. `bst.get(k, missing)` with some `missing = object()`
+        tells a missing key from a `None` value in a single search,
+        instead of `contains(k)` then `get(k)`.
         """
+        if self._eytzinger is not None:
+            sort_keys, _, vals = self._eytzinger
+            sk = self._sort_key(k)
+            n = len(sort_keys)
+            i = 0
+            best = -1
+
+            # one `<` per level, see `_get_node_at`
+            while i < n:
+                if sk < sort_keys[i]:
+                    i = 2 * i + 1
+                else:
+                    best = i
+                    i = 2 * i + 2
+
+            if best >= 0 and sort_keys[best] == sk:
+                return vals[best]
+
+            return default
+
         node = self._get_node_at(k)
 
         if node is None:
-            return None
+            return default
         else:
             return node.val
 
@@ -142,121 +185,253 @@ class BST:
     def _get_parent_node(self, k):
         """
         Returns the parent _Node object of the _Node at `k`.
+
+        Nodes have no link to their parent: it is the last node
+        visited on the way down to `k`.
         """
-        node = self._get_node_at(k)
+        sk = self._sort_key(k)
+        parent = None
+        node = self.root
+
+        while node is not None:
+            nk = node.sort_key
+            if sk == nk:
+                break
+            parent = node
+            node = node.right if sk > nk else node.left
 
         if node is None:
             raise KeyError("Given key is not in the tree.")
 
-        return node.parent
+        return parent
 
     def put(self, k, v):
         """
         Inserts the specified key-value pair into the BST.
         If the BST contains `k`, overwrites the old value with `v`.
+
+        Iterative: descends to the null link where `k` belongs, saving
+        the path from the root, links the new node there and (if sizes
+        are kept, see `_update_sizes`) adds it to the size of each
+        node on the path.
         """
-        self.root = self._put(self.root, k, v)
+        self._eytzinger = None
 
-    def _put(self, node, k, v, parent=None):
-        if node is None:
-            return self._Node(k, v, parent=parent)
+        sk = self._sort_key(k)
+        path = []
+        node = self.root
+
+        while node is not None:
+            nk = node.sort_key
+            if sk == nk:
+                # just update node's value, no subtree resizing
+                node.val = v
+                return
+
+            path.append(node)
+            node = node.left if sk < nk else node.right
+
+        node = self._Node(k, v, sort_key=sk)
+
+        if not path:
+            self.root = node
+            return
+
+        parent = path[-1]
+        if sk < parent.sort_key:
+            parent.left = node
+        else:
+            parent.right = node
+
+        if self._sized:
+            for ancestor in path:
+                ancestor.size += 1
+
+    def _splice(self, node, child, path):
+        """
+        Replaces `node`, which has at most one child, by that `child`
+        in its parent (or at the root), then (if sizes are kept)
+        removes `node` from the size of each of its ancestors.
+
+        `path` lists the ancestors of `node`, from the root down to
+        its parent.
+        """
+        self._eytzinger = None
 
-        if k < node.key:
-            # insert to the left
-            node.left = self._put(node.left, k, v, parent=node)
+        if not path:
+            self.root = child
+        elif path[-1].left is node:
+            path[-1].left = child
+        else:
+            path[-1].right = child
 
-        elif k > node.key:
-            # insert to the right
-            node.right = self._put(node.right, k, v, parent=node)
+        if self._sized:
+            for ancestor in path:
+                ancestor.size -= 1
 
-        else:  # just update node's value, no subtree resizing
-            node.val = v
+    def _update_sizes(self):
+        """
+        Subtree sizes are only needed by `size` and `get_rank`, so
+        writes don't keep them up to date until one of those is first
+        called: then every size is recomputed, bottom-up (post-order
+        walk), and from then on `put` and deletions update them.
+        """
+        stack = []
+        node = self.root
+        last = None     # last node whose size was set
 
-        # update node size based on its children
-        node.size = 1 + self._size(node.left) + self._size(node.right)
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+            node = stack[-1]
+
+            # back from the left subtree: do the right one first
+            if node.right is not None and node.right is not last:
+                node = node.right
+                continue
+
+            left, right = node.left, node.right
+            node.size = 1 + (0 if left is None else left.size) \
+                + (0 if right is None else right.size)
+            last = stack.pop()
+            node = None
+
+        self._sized = True
+
+    @classmethod
+    def from_items(cls, items, key=None):
+        """
+        Builds a BST from `(key, value)` pairs, in any order, in
+        O(n) after sorting them: instead of `put`ting each pair
+        (a walk down from the root each), the middle pair of the
+        sorted ones becomes the root and each half, recursively,
+        one of its subtrees. The tree is perfectly balanced.
+
+        As with `put`, the last value given for a key wins.
+        `key` is the sort key function, as in `BST(key)`.
+        """
+        bst = cls(key)
+        sort_key = bst._sort_key
+
+        # (sort key, key, value), sorted by sort key (stable)
+        triples = sorted(((sort_key(k), k, v) for k, v in items),
+                         key=lambda triple: triple[0])
+
+        # drop repeated keys, keeping their last value
+        unique = []
+        for triple in triples:
+            if unique and unique[-1][0] == triple[0]:
+                unique[-1] = triple
+            else:
+                unique.append(triple)
+
+        bst.root = bst._build(unique, 0, len(unique))
+        bst._sized = True
+
+        return bst
+
+    def _build(self, triples, lo, hi):
+        """
+        Builds a perfectly balanced subtree from the
+        `(sort key, key, value)` triples in `triples[lo:hi]`
+        and returns its root.
+        """
+        if lo >= hi:
+            return None
+
+        mid = (lo + hi) // 2
+        sk, k, v = triples[mid]
+        node = self._Node(k, v, sort_key=sk)
+        node.size = hi - lo
+        node.left = self._build(triples, lo, mid)
+        node.right = self._build(triples, mid + 1, hi)
 
         return node
 
     def get_max_key(self):
         max_node = self._get_max_node(self.root)
 
-        if max_node == None:
+        if max_node is None:
             return None
 
         return max_node.key
 
     def _get_max_node(self, subtree):
-        if subtree == None:
+        if subtree is None:
             return None
 
-        if subtree.right == None:
-            return subtree
+        while subtree.right is not None:
+            subtree = subtree.right
 
-        return self._get_max_node(subtree.right)
+        return subtree
 
     def get_min_key(self):
         min_node = self._get_min_node(self.root)
 
-        if min_node == None:
+        if min_node is None:
             return None
 
         return min_node.key
 
     def _get_min_node(self, subtree):
-        if subtree == None:
+        if subtree is None:
             return None
 
-        if subtree.left == None:
-            return subtree
+        while subtree.left is not None:
+            subtree = subtree.left
 
-        return self._get_min_node(subtree.left)
+        return subtree
 
     def get_floor(self, k):
         """
         Returns LARGEST key that is less than `k`.
 
         Steps:
-        1) Starting from the root element of a subtree, compare `k` and the key:
+        1) Starting from the root, compare `k` and the node's key:
 
-            - if `k` is the root, then it is the floor
-
-            - `k` < key at this root: must look in the left subtree for a key
+            - `k` < node's key: must look in the left subtree for a key
             less than `k`.
 
-            - `k` > key at root: this root could be the floor, but we must check
-            for another potential floor in the right subtree. That is, we
-            recursively call get_floor with right subtree as root to find a
-            larger floor for `k`.
-        """
-        floor_node = self._get_floor(self.root, k)
+            - `k` >= node's key: this node could be the floor, but there
+            may be a larger floor in the right subtree. So, remember it
+            as the best floor so far and keep looking to the right.
 
-        if floor_node == None:
-            return None
+        2) Repeat until hit a null link: the best floor so far (if any)
+        is the floor. If `k` is in the BST, it is the last node
+        remembered: the keys below it on the way down are all larger.
+        """
+        sk = self._sort_key(k)
 
-        return floor_node.key
+        if self._eytzinger is not None:
+            sort_keys, keys, _ = self._eytzinger
+            n = len(sort_keys)
+            i = 0
+            best = -1
 
-    def _get_floor(self, subtree, k):
-        if subtree is None:
-            return None
+            while i < n:
+                if sk < sort_keys[i]:
+                    i = 2 * i + 1
+                else:
+                    best = i
+                    i = 2 * i + 2
 
-        # the root is the floor itself
-        if k == subtree.key:
-            return subtree
+            return None if best < 0 else keys[best]
 
-        if k < subtree.key:
-            # floor must be in left subtree
-            left_subtree = subtree.left
-            return self._get_floor(left_subtree, k)
+        node = self.root
+        best = None
 
-        # ELSE: floor must be in right subtree
-        right_subtree = subtree.right
-        larger_floor = self._get_floor(right_subtree, k)
+        # no separate test for `k` itself: once it is the best floor,
+        # every key below it on the way down is larger
+        while node is not None:
+            if sk < node.sort_key:
+                node = node.left
+            else:
+                best = node
+                node = node.right
 
-        if larger_floor is None:
-            # if no larger floor is found, than this floor is the one
-            return subtree
-        else:
-            return larger_floor
+        return None if best is None else best.key
 
     def get_ceiling(self, k):
         """
@@ -264,49 +439,45 @@ class BST:
 
         Steps:
 
-        1) starting from the subtree `root` element
-            - if `k` == `root`, then `root` is the ceiling.
+        1) Starting from the root, compare `k` and the node's key:
+            - if `k` > node's key, then the ceiling is in the right
+            subtree and the node has nothing to do whatsoever with it.
 
-            - if `k` > `root`, then the the ceiling is in the right subtree and
-            the root node has nothing to do whatsaoever with it. So, we recurse
-            with the right subtree as `root`. If, by any chance, the right
-            subtree is `None`, the recursive call will return `None`.
+            - if `k` <= node's key, then the node may be the ceiling or
+            the ceiling is in its left subtree. So, remember it as the
+            best ceiling so far and keep looking to the left.
 
-            - if `k` < `root`, then `root` may be the ceiling or the ceiling is
-            in the left subtree. then:
-                    - recursively call get_ceiling. when the returned value is
-                    None, we've found the ceiling
+        2) Repeat until hit a null link: the best ceiling so far (if
+        any) is the ceiling.
         """
-        ceiling_node = self._get_ceiling(self.root, k)
+        sk = self._sort_key(k)
 
-        if ceiling_node == None:
-            return None
+        if self._eytzinger is not None:
+            sort_keys, keys, _ = self._eytzinger
+            n = len(sort_keys)
+            i = 0
+            best = -1
 
-        return ceiling_node.key
+            while i < n:
+                if sk > sort_keys[i]:
+                    i = 2 * i + 2
+                else:
+                    best = i
+                    i = 2 * i + 1
 
-    def _get_ceiling(self, subtree, k):
-        if subtree is None:
-            return None
+            return None if best < 0 else keys[best]
 
-        if k == subtree.key:
-            return subtree
-
-        if k > subtree.key:
-            # ceiling must be in right subtree
-            right_subtree = subtree.right
-            return self._get_ceiling(right_subtree, k)
-
-        # ELSE: ceiling could be this subtree's root or be in its left subtree
-        left_subtree = subtree.left
+        node = self.root
+        best = None
 
-        # recurse to look for a smaller ceiling in the left subtree
-        smaller_ceiling = self._get_ceiling(left_subtree, k)
+        while node is not None:
+            if sk > node.sort_key:
+                node = node.right
+            else:
+                best = node
+                node = node.left
 
-        # check if smaller ceiling found
-        if smaller_ceiling is None:
-            return subtree
-        else:
-            return smaller_ceiling
+        return None if best is None else best.key
 
     def get_rank(self, k):
         """
@@ -314,39 +485,134 @@ class BST:
         position within the BST when the nodes are arranged in ascending
         order. In other words, the rank of a node represents the number
         of nodes that are less than or equal to that node.
+
+        Starting at the root, with `rank = 0`:
+
+        1) If `k < node.key`, `k` is in the left subtree: go left.
+
+        2) If `k >= node.key`, then `k` is the node or in its right
+        subtree: add `1` (to count the node) and the keys in its left
+        subtree (i.e. size of `node.left`) to `rank`, and go right.
+
+        When hit a null link, `rank` counts all the keys less than or
+        equal to `k`.
+        """
+        if not self._sized:
+            self._update_sizes()
+
+        sk = self._sort_key(k)
+        rank = 0
+        node = self.root
+
+        # as in `get_floor`, the node at `k` needs no test of its own:
+        # past it, every key is larger and adds nothing to `rank`
+        while node is not None:
+            if sk < node.sort_key:
+                node = node.left
+            else:
+                left = node.left
+                rank += 1 + (0 if left is None else left.size)
+                node = node.right
+
+        return rank
+
+    def __iter__(self):
+        """
+        Iterates over the keys in ascending order.
         """
-        return self._rank(k, self.root)
+        for node in self._in_order():
+            yield node.key
 
-    def _rank(self, k, subtree_root):
+    def _in_order(self):
         """
-        Returns the rank of the `_Node` object at given key `k`
-        in a given subtree with root `subtree_root`:
+        Yields the nodes in ascending key order: in-order walk with
+        an explicit stack, so it never recurses.
+        """
+        stack = []
+        node = self.root
 
-        1) If the _Node for the given key is the same as the given
-        `subtree_root`, the rank of `k` is the rank of the `subtree_root`,
-        which is all elements to the left of it.
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
 
-        2) If `k < subtree_node.key`, `k` is in the left subtree,
-        i.e. `subtree_root = subtree_root.left`.
+    def keys(self, lo=None, hi=None):
+        """
+        Returns all keys in the BST between `lo` (inclusive) and
+        `hi` (also inclusive) in ascending order. If `lo` or `hi`
+        is not given, the range is open on that side.
 
-        3) If `k > subtree_node.key`, then `k` is in the right subtree.
-        Here, the rank of `k` will be the sum of:
-                - `1` (to count the key at the subtree_root).
-                - keys in the left subtree (i.e. size of `subtree_root.left`).
-                - rank of `k` in the right subtree (i.e. recursive call to `_rank`).
+        In-order walk that skips the subtrees out of the range: it
+        goes down the left spine only through keys not less than `lo`,
+        and stops at the first key greater than `hi`.
         """
-        if subtree_root is None:
-            return 0
+        sort_key = self._sort_key
+        lo = None if lo is None else sort_key(lo)
+        hi = None if hi is None else sort_key(hi)
+
+        q = []      # queue
+        stack = []
+        node = self.root
 
-        if k == subtree_root.key:
-            return 1 + self._size(subtree_root.left)
+        while True:
+            while node is not None:
+                if lo is not None and node.sort_key < lo:
+                    # node and its left subtree are out of range
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
 
-        if k < subtree_root.key:
-            return self._rank(k, subtree_root.left)
+            if not stack:
+                return q
 
-        if k > subtree_root.key:
-            right_subtree = subtree_root.right
-            return 1 + self._size(subtree_root.left) + self._rank(k, right_subtree)
+            node = stack.pop()
+
+            if hi is not None and node.sort_key > hi:
+                return q
+
+            q.append(node.key)
+            node = node.right
+
+    def freeze(self):
+        """
+        Lays out the keys (and values, and sort keys) in lists in
+        Eytzinger order, i.e. the order of a breadth-first walk of a complete
+        BST: the children of index `i` are at `2i + 1` and `2i + 2`.
+
+        Until the next `put` or deletion, `get`, `contains`,
+        `get_floor` and `get_ceiling` search those lists instead of
+        chasing node links. The top levels of the search, shared by
+        every lookup, sit together at the start of the lists.
+
+        Meant for trees built once and then queried many times.
+        """
+        # sorted keys and values: in-order walk
+        pairs = [(node.sort_key, node.key, node.val)
+                 for node in self._in_order()]
+        stack = []
+
+        # an in-order walk of the implicit complete tree visits its
+        # indices in ascending key order
+        n = len(pairs)
+        sort_keys = [None] * n
+        keys = [None] * n
+        vals = [None] * n
+        pairs = iter(pairs)
+        i = 0
+
+        while stack or i < n:
+            while i < n:
+                stack.append(i)
+                i = 2 * i + 1
+            i = stack.pop()
+            sort_keys[i], keys[i], vals[i] = next(pairs)
+            i = 2 * i + 2
+
+        self._eytzinger = (sort_keys, keys, vals)
 
     def del_max(self):
         """
@@ -358,20 +624,13 @@ class BST:
         if self.is_empty:
             raise KeyError("BST is empty.")
 
-        self.root = self._del_max(self.root)
-
-    def _del_max(self, node):
-        # if the given node is the maximum
-        if node.right is None:
-            # replace the node with its left link
-            return node.left
-
-        # recurse
-        node.right = self._del_max(node.right)
+        path = []
+        node = self.root
+        while node.right is not None:
+            path.append(node)
+            node = node.right
 
-        # update size: self + left + right
-        node.size = 1 + self._size(node.left) + self._size(node.right)
-        return node
+        self._splice(node, node.left, path)
 
     def del_min(self):
         """
@@ -382,32 +641,18 @@ class BST:
         if self.is_empty:
             raise KeyError("BST is empty.")
 
-        self.root = self._del_min(self.root)
-        
-    def _del_min(self, node):
-        # if given node is the smallest
-        if node.left is None:
-            # replace the node with its right link
-            return node.right
-        
-        # ELSE: recurse for next smaller node
-        node.left = self._del_min(node.left)
-        
-         # update size: 1 (self) + size(left) + size(right)
-        node.size = 1 + self._size(node.left) + self._size(node.right)
-        return node
+        path = []
+        node = self.root
+        while node.left is not None:
+            path.append(node)
+            node = node.left
+
+        self._splice(node, node.right, path)
 
     def del_key(self, k):
         """
         Removes _Node at the given key `k`.
-        """
-        if not self.contains(k):
-            raise KeyError(f"This BST does not contain `{k}`.")
-        
-        self.root = self._del_key(k, self.root)
 
-    def _del_key(self, k, node):
-        """
         Deleted node replacement:
         
         ### CASE 1: node has only 1 child
@@ -417,62 +662,88 @@ class BST:
             
             Delete a node by replacing it with its successor. The successor
             is the node with the smallest key in its right subtree.
+
+            Always picking the successor makes the tree lean left (and
+            grow taller) over many deletions. So, when the left subtree
+            is the larger one, the node is replaced by its predecessor
+            instead, the node with the largest key in its left subtree:
+            the replacement comes from, and shrinks, the larger side.
+            Until sizes are kept (see `_update_sizes`), it is always
+            the successor.
             
-            Steps:
+            Steps (for the successor, symmetric for the predecessor):
             
-            1) Save a link to the node to be deleted (aux_node)
+            1) Find the successor, the leftmost node of the right subtree
+            (it has no left child).
             
-            2) Set node to point to its successor _min(aux_node.right).
+            2) Splice the successor out of the tree, replacing it by its
+            right link: every ancestor of it, including the deleted node,
+            loses one from its size.
             
-            3) Set the right link of node (which is supposed to point to
-            the BST containing all the keys larger than node.key) to
-            del_min(aux_node.right), the link to the BST containing all
-            the keys that are larger than node.key after the deletion.
-
-            4) Set the left link of node (which was None) to aux_node.left
-            (all the keys that are less than both the deleted key and its
-            successor).
+            3) Put the successor in the deleted node's place: it takes
+            the deleted node's links and (updated) size.
         """
+        # find the node, saving the path down to it
+        sk = self._sort_key(k)
+        path = []
+        node = self.root
+
+        while node is not None:
+            nk = node.sort_key
+            if sk == nk:
+                break
+            path.append(node)
+            node = node.right if sk > nk else node.left
+
         if node is None:
-            return None
-        
-        if k < node.key:
-            node.left = self._del_key(k, node.left)
-        
-        elif k > node.key:
-            node.right = self._del_key(k, node.right)
-        
-        else: # k == node.key
-            
-            ### CASE 1: node has 1 or no child:
-            # 1.1
-            if node.right is None:
-                return node.left
-            # 1.2
-            if node.left is None:
-                return node.right
-            
-            ### CASE 2
-            
-            # 1) save object reference
-            deleted_node = node
-            
-            # 2) pick its sucessor. `node` now is the successor.
-            node = self._get_min_node(deleted_node.right)
-            
-            # 3) Set the right link of the new node to the link to the BST
-            # containing all the keys that are larger than node.key
-            # after the deletion
-            node.right = self._del_min(deleted_node.right)
-            
-            # 4) Set the left link of the NEW NODE (which was None)
-            # to aux_node.left
-            node.left = deleted_node.left
+            raise KeyError(f"This BST does not contain `{k}`.")
+
+        ### CASE 1: node has 1 or no child:
+        # 1.1
+        if node.right is None:
+            self._splice(node, node.left, path)
+            return
+        # 1.2
+        if node.left is None:
+            self._splice(node, node.right, path)
+            return
+
+        ### CASE 2
         
-        # update size
-        node.size = 1 + self._size(node.left) + self._size(node.right)
-        return node
+        # 1) pick its sucessor, or its predecessor if the
+        # left subtree is larger (when sizes are kept)
+        replacement_path = path + [node]
+
+        if self._sized and node.left.size > node.right.size:
+            replacement = node.left
+            while replacement.right is not None:
+                replacement_path.append(replacement)
+                replacement = replacement.right
+
+            # 2) take the predecessor out of the tree
+            self._splice(replacement, replacement.left, replacement_path)
+        else:
+            replacement = node.right
+            while replacement.left is not None:
+                replacement_path.append(replacement)
+                replacement = replacement.left
+
+            # 2) take the successor out of the tree
+            self._splice(replacement, replacement.right, replacement_path)
+
+        # 3) put the replacement in the deleted node's place
+        replacement.left = node.left
+        replacement.right = node.right
+        replacement.size = node.size
+
+        if not path:
+            self.root = replacement
+        elif path[-1].left is node:
+            path[-1].left = replacement
+        else:
+            path[-1].right = replacement
 
+import sys
 import unittest
 from random import randint, randrange
 
@@ -535,6 +806,18 @@ class TestsBST(unittest.TestCase):
         result = self.bst.get(5)
         self.assertEqual(result, None)
 
+    def test_get_default(self):
+        missing = object()
+        self.assertIs(missing, self.bst.get(5, missing))
+
+        self.bst.put(5, None)
+        self.assertIsNone(self.bst.get(5, missing))
+        self.assertIs(missing, self.bst.get(7, missing))
+
+        self.bst.freeze()
+        self.assertIsNone(self.bst.get(5, missing))
+        self.assertIs(missing, self.bst.get(7, missing))
+
     def test_contains(self):
         # empty tree contains no key
         self.assertFalse(self.bst.contains(1))
@@ -549,6 +832,7 @@ class TestsBST(unittest.TestCase):
         self.assertTrue(self.bst.contains(7))
 
     def test_put_new_key(self):
+        self.bst.size()     # keep sizes, for `assertSizeConsistency`
         self.bst.put(5, "apple")
 
         result = self.bst.get(5)
@@ -557,6 +841,7 @@ class TestsBST(unittest.TestCase):
         self.assertSizeConsistency(self.bst.root)
 
     def test_put_duplicate_key(self):
+        self.bst.size()     # keep sizes, for `assertSizeConsistency`
         self.bst.put(5, "apple")
         self.bst.put(5, "banana")
 
@@ -566,6 +851,7 @@ class TestsBST(unittest.TestCase):
         self.assertSizeConsistency(self.bst.root)
 
     def test_put_multiple_keys(self):
+        self.bst.size()     # keep sizes, for `assertSizeConsistency`
         self.bst.put(5, "apple")
         self.bst.put(2, "banana")
         self.bst.put(7, "cherry")
@@ -577,6 +863,7 @@ class TestsBST(unittest.TestCase):
         self.assertSizeConsistency(self.bst.root)
 
     def test_put_and_get_large_tree(self):
+        self.bst.size()     # keep sizes, for `assertSizeConsistency`
         for i in range(1, 101):
             self.bst.put(i, str(i))
 
@@ -598,19 +885,22 @@ class TestsBST(unittest.TestCase):
         self.assertOrderingProperty(self.bst.root)
 
     def assertOrderingProperty(self, node):
-        if node is None:
-            return True
+        # every node checked once, with an explicit stack
+        stack = [] if node is None else [node]
+        while stack:
+            node = stack.pop()
+            left_subtree = node.left
+            right_subtree = node.right
 
-        left_subtree = node.left
-        right_subtree = node.right
+            if left_subtree is not None:
+                self.assertLess(left_subtree.key, node.key)
+                stack.append(left_subtree)
 
-        if left_subtree is not None:
-            self.assertLess(left_subtree.key, node.key)
-            self.assertOrderingProperty(left_subtree)
+            if right_subtree is not None:
+                self.assertGreater(right_subtree.key, node.key)
+                stack.append(right_subtree)
 
-        if right_subtree is not None:
-            self.assertGreater(right_subtree.key, node.key)
-            self.assertOrderingProperty(right_subtree)
+        return True
 
     def test_get_max_key(self):
         # empty tree
@@ -867,6 +1157,18 @@ class TestsBST(unittest.TestCase):
         self.assertEqual(self.bst.get_rank(70), 5)
         self.assertEqual(self.bst.get_rank(80), 6)
 
+    def test_get_rank_missing_key(self):
+        self.assertEqual(0, self.bst.get_rank(50))
+
+        for key in [50, 70, 30, 10, 80, 40]:
+            self.bst.put(key, key)
+
+        # number of keys less than the missing key
+        self.assertEqual(0, self.bst.get_rank(5))
+        self.assertEqual(2, self.bst.get_rank(35))
+        self.assertEqual(4, self.bst.get_rank(60))
+        self.assertEqual(6, self.bst.get_rank(99))
+
     def test_get_parent_node(self):
         # empty tree
         with self.assertRaises(KeyError):
@@ -1014,6 +1316,8 @@ class TestsBST(unittest.TestCase):
         with self.assertRaises(KeyError):
             self.bst.del_key(1)
 
+        self.bst.size()     # keep sizes, for `assertSizeConsistency`
+
         # not-empty tree
         self.bst.put(5, "apple")
         self.bst.put(2, "banana")
@@ -1083,18 +1387,320 @@ class TestsBST(unittest.TestCase):
         self.assertSizeConsistency(self.bst.root)
         self.assertTrue(self.bst.is_empty)
 
-    def assertSizeConsistency(self, subtree):
+    def test_Node_has_no_dict(self):
+        node = self.bst._Node(1, 'a')
+        self.assertFalse(hasattr(node, '__dict__'))
+        with self.assertRaises(AttributeError):
+            node.color = True
+
+    def test_freeze(self):
+        keys = [randint(0, 1_000) for _ in range(500)]
+        for key in keys:
+            self.bst.put(key, str(key))
+
+        expected = [(self.bst.get(k), self.bst.get_floor(k),
+                     self.bst.get_ceiling(k)) for k in range(-1, 1_002)]
+
+        self.bst.freeze()
+        self.assertEqual(len(set(keys)), len(self.bst._eytzinger[1]))
+        result = [(self.bst.get(k), self.bst.get_floor(k),
+                   self.bst.get_ceiling(k)) for k in range(-1, 1_002)]
+        self.assertEqual(expected, result)
+
+    def test_freeze_empty_tree(self):
+        self.bst.freeze()
+        self.assertIsNone(self.bst.get(1))
+        self.assertIsNone(self.bst.get_floor(1))
+        self.assertIsNone(self.bst.get_ceiling(1))
+
+    def test_changes_after_freeze(self):
+        for key in [5, 2, 7, 4]:
+            self.bst.put(key, str(key))
+        self.bst.freeze()
+
+        self.bst.put(5, "apple")
+        self.assertEqual("apple", self.bst.get(5))
+        self.bst.freeze()
+
+        self.bst.del_key(7)
+        self.assertFalse(self.bst.contains(7))
+        self.assertEqual(5, self.bst.get_floor(9))
+
+    def test_tree_deeper_than_recursion_limit(self):
+        # sorted keys: a single right spine
+        n = 2 * sys.getrecursionlimit()
+        for key in range(n):
+            self.bst.put(key, str(key))
+
+        self.assertEqual(n, self.bst.size())
+        self.assertEqual(str(n - 1), self.bst.get(n - 1))
+        self.assertEqual(n - 1, self.bst.get_rank(n - 2))
+
+        self.bst.del_max()
+        self.bst.del_key(n // 2)
+        self.bst.del_min()
+
+        self.assertEqual(n - 3, self.bst.size())
+        self.assertEqual(n - 3, self.bst.size(1))
+        self.assertEqual(n // 2 - 1, self.bst.get_floor(n // 2))
+        self.assertEqual(n - 2, self.bst.get_max_key())
+
+    def test_from_items(self):
+        items = [(randint(0, 1_000), i) for i in range(500)]
+        bst = BST.from_items(items)
+
+        expected = dict(items)
+        self.assertEqual(len(expected), bst.size())
+        for key, val in expected.items():
+            self.assertEqual(val, bst.get(key))
+
+        self.assertOrderingProperty(bst.root)
+        self.assertSizeConsistency(bst.root, bst)
+        for key in expected:
+            parent = bst._get_parent_node(key)
+            if parent is not None:
+                node = bst._get_node_at(key)
+                self.assertIn(node, (parent.left, parent.right))
+
+        # perfectly balanced: height of floor(lg n) + 1 levels at most
+        self.assertEqual(bst.get_max_key(), max(expected))
+        depth = 0
+        node = bst.root
+        while node is not None:
+            depth += 1
+            node = node.right
+        self.assertLessEqual(depth, len(expected).bit_length())
+
+    def test_from_items_empty(self):
+        bst = BST.from_items([])
+        self.assertTrue(bst.is_empty)
+        bst.put(1, 'a')
+        self.assertEqual('a', bst.get(1))
+
+    def test_sort_key(self):
+        # strings of up to 8 bytes, compared as 64-bit ints
+        def sort_key(s):
+            return int.from_bytes(s.encode().ljust(8, b'\0'), 'big')
+
+        bst = BST(key=sort_key)
+        words = ['pear', 'apple', 'fig', 'banana', 'kiwi', 'cherry']
+        for word in words:
+            bst.put(word, word.upper())
+        bst.put('fig', 'FIG!')
+
+        self.assertEqual(len(words), bst.size())
+        self.assertEqual('FIG!', bst.get('fig'))
+        self.assertIsNone(bst.get('grape'))
+        self.assertEqual('fig', bst.get_floor('grape'))
+        self.assertEqual('kiwi', bst.get_ceiling('grape'))
+        self.assertEqual(4, bst.get_rank('fig'))
+        self.assertEqual('apple', bst.get_min_key())
+
+        bst.freeze()
+        self.assertEqual('FIG!', bst.get('fig'))
+        self.assertEqual('fig', bst.get_floor('grape'))
+        self.assertEqual('kiwi', bst.get_ceiling('grape'))
+
+        bst.del_key('fig')
+        self.assertFalse(bst.contains('fig'))
+        self.assertEqual('cherry', bst.get_floor('grape'))
+
+        bst = BST.from_items(((w, w.upper()) for w in words), key=sort_key)
+        self.assertEqual('KIWI', bst.get('kiwi'))
+        self.assertEqual(sorted(words).index('pear') + 1, bst.get_rank('pear'))
+
+    def test_sort_key_ties(self):
+        # first 8 bytes only: longer strings may share a sort key
+        def sort_key(s):
+            return int.from_bytes(s.encode()[:8].ljust(8, b'\0'), 'big')
+
+        bst = BST(key=sort_key)
+        words = ['b', 'aa', 'c', 'abcdefghY', 'abcdefghX', 'abcdefgh']
+        for word in words:
+            bst.put(word, word.upper())
+
+        self.assertEqual(sorted(words), list(bst))
+        self.assertEqual('ABCDEFGHX', bst.get('abcdefghX'))
+        self.assertEqual('ABCDEFGHY', bst.get('abcdefghY'))
+        self.assertIsNone(bst.get('abcdefghZ'))
+        self.assertEqual('abcdefghY', bst.get_floor('abcdefghZ'))
+        self.assertEqual('abcdefghX', bst.get_ceiling('abcdefgh0'))
+        self.assertEqual('aa', bst.get_min_key())
+        self.assertEqual(['abcdefgh', 'abcdefghX'],
+                         bst.keys('abcdefgh', 'abcdefghX'))
+
+        bst.freeze()
+        self.assertEqual('ABCDEFGHX', bst.get('abcdefghX'))
+        self.assertEqual('abcdefghY', bst.get_floor('abcdefghZ'))
+
+        bst = BST.from_items(((w, w.upper()) for w in words), key=sort_key)
+        self.assertEqual(sorted(words), list(bst))
+        self.assertEqual('ABCDEFGHY', bst.get('abcdefghY'))
+
+    def test_sizes_updated_on_first_use(self):
+        for key in [5, 2, 7, 4, 6]:
+            self.bst.put(key, str(key))
+        self.assertFalse(self.bst._sized)
+
+        self.assertEqual(3, self.bst.get_rank(5))
+        self.assertTrue(self.bst._sized)
+        self.assertEqual(2, self.bst.size(2))
+
+        # from then on, writes keep them up to date
+        self.bst.put(3, '3')
+        self.bst.del_key(7)
+        self.assertEqual(5, self.bst.root.size)
+        self.assertEqual(3, self.bst.root.left.size)
+        self.assertEqual(1, self.bst.root.right.size)
+
+    def test_iter(self):
+        self.assertEqual([], list(self.bst))
+
+        keys = [randint(0, 1_000) for _ in range(200)]
+        for key in keys:
+            self.bst.put(key, str(key))
+
+        self.assertEqual(sorted(set(keys)), list(self.bst))
+
+    def test_iter_deeper_than_recursion_limit(self):
+        n = 2 * sys.getrecursionlimit()
+        for key in range(n):
+            self.bst.put(key, key)
+
+        self.assertEqual(list(range(n)), list(self.bst))
+
+    def test_keys(self):
+        for key in [50, 70, 30, 10, 80, 40]:
+            self.bst.put(key, str(key))
+
+        self.assertEqual([10, 30, 40, 50, 70, 80], self.bst.keys())
+        self.assertEqual([30, 40, 50], self.bst.keys(30, 50))
+        self.assertEqual([30, 40, 50], self.bst.keys(25, 55))
+        self.assertEqual([70, 80], self.bst.keys(lo=60))
+        self.assertEqual([10, 30], self.bst.keys(hi=35))
+        self.assertEqual([], self.bst.keys(41, 49))
+        self.assertEqual([], self.bst.keys(90, 99))
+        self.assertEqual([], BST().keys())
+
+    def test_put_after_deletions(self):
+        keys = list(set(randint(0, 1_000) for _ in range(200)))
+        for key in keys:
+            self.bst.put(key, str(key))
+
+        # deletions move nodes around: sizes along the way must follow
+        self.bst.size()
+        for _ in range(50):
+            self.bst.del_key(keys.pop(randrange(len(keys))))
+        self.bst.del_min()
+        self.bst.del_max()
+
+        for key in range(1_001, 1_051):
+            self.bst.put(key, str(key))
+
+        self.assertOrderingProperty(self.bst.root)
+        self.assertSizeConsistency(self.bst.root)
+        self.assertEqual(len(keys) - 2 + 50, self.bst.size())
+
+    def test_del_key_without_sizes(self):
+        for key in [5, 2, 7, 1, 4, 3, 6]:
+            self.bst.put(key, str(key))
+        #       (5)
+        #      /   \
+        #    (2)   (7)
+        #   /   \   /
+        # (1)  (4) (6)
+        #       /
+        #     (3)
+
+        # sizes not kept: the successor, whatever the sizes
+        self.bst.del_key(5)
+        self.assertFalse(self.bst._sized)
+        self.assertEqual(6, self.bst.root.key)
+        self.bst.del_key(6)
+        self.assertEqual(7, self.bst.root.key)
+        self.assertIsNone(self.bst.root.right)
+        self.assertOrderingProperty(self.bst.root)
+        self.assertEqual(5, self.bst.size())
+        self.assertSizeConsistency(self.bst.root)
+
+    def test_del_key_larger_left_subtree(self):
+        for key in [8, 4, 10, 2, 6, 9, 1, 3, 5, 7]:
+            self.bst.put(key, str(key))
+        #          (8)
+        #        /     \
+        #     (4)       (10)
+        #    /   \      /
+        #  (2)   (6)  (9)
+        #  / \   / \
+        # (1)(3)(5)(7)
+
+        # once sizes are kept, a larger left subtree means the
+        # predecessor, every time
+        self.assertEqual(10, self.bst.size())
+        self.bst.del_key(8)
+        self.assertEqual(7, self.bst.root.key)
+        self.bst.del_key(7)
+        self.assertEqual(6, self.bst.root.key)
+        self.assertEqual(9, self.bst.root.right.left.key)
+        self.assertOrderingProperty(self.bst.root)
+        self.assertSizeConsistency(self.bst.root)
+        self.assertEqual(8, self.bst.size())
+
+    def test_update_sizes(self):
+        keys = set(randint(0, 1_000) for _ in range(300))
+        for key in keys:
+            self.bst.put(key, str(key))
+        for key in list(keys)[:100]:
+            self.bst.del_key(key)
+
+        self.assertFalse(self.bst._sized)
+        self.bst._update_sizes()
+        self.assertTrue(self.bst._sized)
+        self.assertSizeConsistency(self.bst.root)
+        self.assertEqual(len(keys) - 100, self.bst.root.size)
+
+    def test_del_key_random(self):
+        keys = list(set(randint(0, 1_000) for _ in range(300)))
+        for key in keys:
+            self.bst.put(key, str(key))
+
+        for _ in range(150):
+            key = keys.pop(randrange(len(keys)))
+            self.bst.del_key(key)
+            self.assertFalse(self.bst.contains(key))
+
+        self.assertEqual(len(keys), self.bst.size())
+        self.assertOrderingProperty(self.bst.root)
+        self.assertSizeConsistency(self.bst.root)
+        for key in keys:
+            self.assertEqual(str(key), self.bst.get(key))
+
+    def assertSizeConsistency(self, subtree, bst=None):
+        """
+        `subtree` belongs to `bst` (`self.bst` unless given), which
+        must keep sizes: until then they are deliberately stale.
+        """
+        bst = self.bst if bst is None else bst
+        self.assertTrue(bst._sized, "sizes aren't kept: call `size()`")
+
         if subtree is None:
             return True
-        
-        subtree_size = self.bst._size(subtree)
-        left_size = self.bst._size(subtree.left)
-        right_size = self.bst._size(subtree.right)
-        expected_size = 1 + left_size + right_size
-        self.assertTrue( subtree_size == expected_size)
-                
-        self.assertSizeConsistency(subtree.left)
-        self.assertSizeConsistency(subtree.right)
-        
+
+        # every node checked once, with an explicit stack
+        stack = [subtree]
+        while stack:
+            node = stack.pop()
+            left, right = node.left, node.right
+            left_size = 0 if left is None else left.size
+            right_size = 0 if right is None else right.size
+            self.assertEqual(1 + left_size + right_size, node.size)
+
+            if left is not None:
+                stack.append(left)
+            if right is not None:
+                stack.append(right)
+
+        return True
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,78 @@
+from array import array
+from collections import OrderedDict
+from math import log
+
+NULL = -1   # index of null links (see `BinarySearchTreeSoA`)
+
+
+def _soa_get(root, keys, left, right, k):
+    """
+    Returns the index of the node with key `k` in the tree rooted
+    at node `root` of a `BinarySearchTreeSoA`, or `NULL`.
+
+    A plain function on the arrays and node indices: no attribute
+    lookups and no value boxed for the result, only an int.
+    """
+    i = root
+
+    while i != NULL:
+        key = keys[i]
+
+        if k == key:
+            return i
+
+        i = left[i] if k < key else right[i]
+
+    return NULL
+
+
+def _soa_rank(root, keys, left, right, sizes, k):
+    """
+    Returns the number of keys less than `k` in the tree rooted at
+    node `root` of a `BinarySearchTreeSoA`, or `NULL` if `k` is not
+    in it: same descent as `BinarySearchTree._rank`, on the arrays.
+    """
+    rank = 0
+    i = root
+
+    while i != NULL:
+        key = keys[i]
+        l = left[i]
+
+        if k == key:
+            return rank + (0 if l == NULL else sizes[l])
+
+        if k < key:
+            i = l
+        else:
+            rank += 1 + (0 if l == NULL else sizes[l])
+            i = right[i]
+
+    return NULL
+
+
+def _soa_select(root, left, right, sizes, r):
+    """
+    Returns the index of the node of rank `r` (0 <= r < tree size)
+    in the tree rooted at node `root` of a `BinarySearchTreeSoA`:
+    same descent as `BinarySearchTree._select`, on the arrays.
+    """
+    i = root
+
+    while True:
+        l = left[i]
+        left_size = 0 if l == NULL else sizes[l]
+
+        if r == left_size:
+            return i
+
+        if r < left_size:
+            i = l
+        else:
+            r -= left_size + 1
+            i = right[i]
+
+
 class BinarySearchTree:
     """
     A binary search tree (BST) is a binary tree where each node has a key
@@ -11,11 +86,34 @@ class BinarySearchTree:
     contains a key, a value, a left link, a right link, and a node count:
         - The left link points to a BST for items with smaller keys;
         - and the right link points to a BST for items with larger keys.
+
+    `get` remembers the values it found in `_cache`, so that looking
+    the same key up again is a single dict lookup (unhashable keys are
+    just searched for, every time). `put` and the deletions keep the
+    cache up to date: if nodes are linked by hand, call `_cache.clear()`.
     """
+    # least recently used entries are dropped past this many cached keys
+    CACHE_MAX_SIZE = 4096
+
+    # scapegoat balance factor, see `_rebalance`
+    _alpha = 0.7
+
+    # removed nodes kept for reuse, at most
+    POOL_MAX_SIZE = 4096
+
+    # free list of removed nodes, see `_new_node`: shared by all the
+    # trees, so that nodes removed from one are reused by the others
+    _pool = []
+
     def __init__(self):
         self.root = None
+        self._cache = OrderedDict()     # key -> value, LRU order
+        # largest size since the last full rebuild, see `_shrink`
+        self._max_size = 0
         
     class _Node:
+        __slots__ = ('key', 'val', 'left', 'right', 'size')
+
         def __init__(self, key, val):
             self.key = key
             self.val = val
@@ -23,21 +121,127 @@ class BinarySearchTree:
             self.right = None
             self.size = 1
     
+    @classmethod
+    def from_sorted(cls, pairs):
+        """
+        Builds a BST from `(key, value)` pairs given in strictly
+        ascending key order, in linear time: the middle key at the
+        root and, recursively, the left and right halves as its
+        subtrees (see `_link_balanced`). The tree is perfectly
+        balanced, instead of taking `n` insertions of O(h) each.
+        """
+        items = list(pairs)
+
+        for i in range(1, len(items)):
+            if not items[i - 1][0] < items[i][0]:
+                raise ValueError("Keys must be in strictly ascending order.")
+
+        bst = cls()
+        nodes = [bst._Node(k, v) for k, v in items]
+        bst.root = bst._link_balanced(nodes, 0, len(nodes))
+        bst._max_size = len(nodes)
+        return bst
+
+    def put_many(self, pairs):
+        """
+        Inserts all the `(key, value)` pairs, as `put` in the given
+        order would (for a repeated key, the last value wins), but
+        rebuilds the tree once instead: the new pairs are sorted and
+        merged with the keys already in the BST, and the result is
+        relinked as a perfectly balanced BST, in O(n + m log m) time
+        for `m` pairs.
+        """
+        items = sorted(pairs, key=lambda pair: pair[0])  # stable
+        if not items:
+            return
+
+        # merge with the BST's nodes, in order, reusing the nodes of
+        # the keys already there
+        nodes = self._nodes_in_order(self.root)
+        merged = []
+        i = 0
+
+        for k, v in items:
+            while i < len(nodes) and nodes[i].key < k:
+                merged.append(nodes[i])
+                i += 1
+
+            if merged and merged[-1].key == k:
+                merged[-1].val = v
+            elif i < len(nodes) and nodes[i].key == k:
+                nodes[i].val = v
+                merged.append(nodes[i])
+                i += 1
+            else:
+                merged.append(self._new_node(k, v))
+
+        merged.extend(nodes[i:])
+
+        self._cache.clear()
+        self.root = self._link_balanced(merged, 0, len(merged))
+        self._max_size = len(merged)
+
+    def _new_node(self, k, v):
+        """
+        Returns a node for the key-value pair: a removed node from
+        `_pool` when there is one, a new one otherwise. Reusing nodes
+        saves allocating and collecting them on heavy put/delete
+        workloads.
+        """
+        if not self._pool:
+            return self._Node(k, v)
+        
+        node = self._pool.pop()
+        node.key = k
+        node.val = v
+        node.size = 1
+        return node
+    
+    def _free(self, node):
+        """
+        Keeps a node removed from the BST in `_pool` for reuse, with
+        its links and contents cleared, so that it keeps nothing alive.
+        """
+        if len(self._pool) < self.POOL_MAX_SIZE:
+            node.key = node.val = node.left = node.right = None
+            self._pool.append(node)
+    
     @property
     def is_empty(self):
         return self.root is None
     
-    def contains(self, k):
+    def __contains__(self, k):
         """
-        Does this BST contain the given key?
+        Does this BST contain the given key? (even if its value
+        is None) Supports `k in bst`.
+        
+        Same descent as `_get`, but stops as soon as `k` is found,
+        without reading any value.
         """
-        return self.get(k) is not None
+        node = self.root
+        
+        while node is not None:
+            key = node.key
+            
+            if k < key:
+                node = node.left
+            elif k > key:
+                node = node.right
+            else:
+                return True
+        
+        return False
+    
+    contains = __contains__
         
     def size(self):
         """
-        Returns the size of the BST.
+        Returns the size of the BST: the size of its root, read
+        directly (no `_size` call, `size` is called on every
+        `select` and deletion).
         """
-        return self._size(self.root)
+        root = self.root
+        return 0 if root is None else root.size
             
     def _size(self, subtree):
         """
@@ -49,14 +253,40 @@ class BinarySearchTree:
             return subtree.size
  
     def get(self, k):
-        if self.is_empty:
-            return None
-        
-        return self._get(k, self.root)
+        cache = self._cache
+
+        try:
+            v = cache[k]
+        except KeyError:
+            pass
+        except TypeError:
+            # unhashable key: can't be cached
+            return self._get(k, self.root)
+        else:
+            cache.move_to_end(k)
+            return v
+
+        v = self._get(k, self.root)
+
+        if len(cache) >= self.CACHE_MAX_SIZE:
+            cache.popitem(last=False)
+        cache[k] = v
+
+        return v
+
+    def _uncache(self, k):
+        """
+        Drops `k` from the `get` cache, if there (unhashable keys
+        never are).
+        """
+        try:
+            self._cache.pop(k, None)
+        except TypeError:
+            pass
     
     def _get(self, k, subtree):
         """
-        A recursive algorithm to search for a key in a BST and return
+        An iterative algorithm to search for a key in a BST and return
         its value `val`.
         
         For a given key, `k`, and a given root of a subtree, `subtree`:
@@ -68,66 +298,166 @@ class BinarySearchTree:
             
             - If `k == subtree.key`, we have a search hit;
             
-            - Otherwise, we search (recursively) in the appropriate
-            subtree until `k` is found or we hit an empty subtree:
+            - Otherwise, we move down to the appropriate subtree and
+            repeat until `k` is found or we hit an empty subtree:
                 
                 - `k < subtree.key`: search in the left subtree
                 
                 - `k > subtree.key`: search in the right subtree
-        """
-        if subtree is None:
-            return None
-        
-        if k == subtree.key:
-            return subtree.val
         
-        if k < subtree.key:
-            return self._get(k, subtree.left)
+        The loop tests `<` and `>` before equality: most levels are
+        not a hit, and they cost one or two comparisons that way
+        instead of always two.
+        """
+        while subtree is not None:
+            key = subtree.key
+            
+            if k < key:
+                subtree = subtree.left
+            elif k > key:
+                subtree = subtree.right
+            else:
+                return subtree.val
         
-        if k > subtree.key:
-            return self._get(k, subtree.right)
+        return None
     
     def put(self, k, v):
-        self.root = self._put(k, v, self.root)
-        
-    def _put(self, k, v, subtree):
         """
-        Searches for a null link (i.e. None) in the given subtree
-        to insert the new key and value pair.
+        Searches for a null link (i.e. None) in the BST to insert the
+        new key and value pair, saving the path from the root:
         
-        (a) If the tree is empty, we return a new node containing
-        the key and value;
+        (a) If the search key `k` is equal to the key at a node,
+        update that Node's value with `v`: no sizes change.
         
-        (b) If the search key `k` is equal to the key at the subtree
-        root, update that Node's value with `v`.
+        (b) If `k` is less than the key at the node, go left;
         
-        (c) If `k` is less than the key at the subtree root, we set
-        the subtree left link to the result of inserting the key into
-        the left subtree;
+        (c) If `k` is greater than the key at the node, go right.
         
-        (d) If `k` is greater than the key at the subtree root, we set
-        the subtree right link to the result of inserting the key into
-        the right subtree.
+        Once a null link is hit, link a new node there (or at the root
+        of an empty tree) and add `1` to the size of every node on the
+        path: those are exactly the subtrees the new node joined.
         """
-        # (a)
-        if subtree is None:
-            return self._Node(k, v)
+        self._uncache(k)
+        path = []
+        node = self.root
         
-        # (b)
-        if k == subtree.key:
-            subtree.val = v
+        while node is not None:
+            key = node.key
+            
+            # (b), (c)
+            if k < key:
+                path.append(node)
+                node = node.left
+            elif k > key:
+                path.append(node)
+                node = node.right
+            # (a)
+            else:
+                node.val = v
+                return
+        
+        node = self._new_node(k, v)
+        
+        if not path:
+            self.root = node
+        elif k < path[-1].key:
+            path[-1].left = node
+        else:
+            path[-1].right = node
         
-        # (c)
-        elif k < subtree.key:
-            subtree.left = self._put(k, v, subtree.left)
+        for ancestor in path:
+            ancestor.size += 1
         
-        # (d)
-        else: # k > subtree.key
-            subtree.right = self._put(k, v, subtree.right)
+        self._max_size = max(self._max_size, self.root.size)
+        self._rebalance(path)
 
-        subtree.size = 1 + self._size(subtree.left) + self._size(subtree.right)
-        return subtree
-    
+    def _rebalance(self, path):
+        """
+        Scapegoat rebalancing after an insertion, given the `path` of
+        the new node's ancestors from the root.
+
+        Nodes store nothing but their size, and the tree is left as is
+        until an insertion lands too deep: deeper than
+        log_{1/alpha}(n) for a tree of size `n`. Then some ancestor
+        of the new node, the "scapegoat", is unbalanced: one of its
+        children holds more than `alpha` of its subtree. The deepest
+        such ancestor is rebuilt as a perfectly balanced subtree (see
+        `_rebuild`), in time linear in its size.
+
+        Rebuilds are rare enough that insertions take amortized
+        O(log n) time, and the tree height stays O(log n).
+        """
+        alpha = self._alpha
+
+        if len(path) <= log(self.root.size, 1 / alpha):
+            return
+
+        # the deepest ancestor with a too heavy child
+        for i in range(len(path) - 1, -1, -1):
+            subtree = path[i]
+            left, right = subtree.left, subtree.right
+            heavier = max(0 if left is None else left.size,
+                          0 if right is None else right.size)
+
+            if heavier > alpha * subtree.size:
+                break
+        else:
+            return
+
+        rebuilt = self._rebuild(subtree)
+
+        if i == 0:
+            self.root = rebuilt
+        elif path[i - 1].left is subtree:
+            path[i - 1].left = rebuilt
+        else:
+            path[i - 1].right = rebuilt
+
+    def _rebuild(self, subtree):
+        """
+        Relinks the nodes of `subtree` as a perfectly balanced BST
+        (the middle key at the root, recursively), and returns its
+        new root. Node objects, keys and values are kept.
+        """
+        nodes = self._nodes_in_order(subtree)
+        return self._link_balanced(nodes, 0, len(nodes))
+
+    def _nodes_in_order(self, subtree):
+        """
+        Returns the nodes of `subtree` in key order: in-order
+        traversal, with an explicit stack.
+        """
+        nodes = []
+        stack = []
+        node = subtree
+
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+            node = stack.pop()
+            nodes.append(node)
+            node = node.right
+
+        return nodes
+
+    def _link_balanced(self, nodes, lo, hi):
+        """
+        Links `nodes[lo:hi]`, sorted by key, into a balanced BST and
+        returns its root.
+        """
+        if lo >= hi:
+            return None
+
+        mid = (lo + hi) // 2
+        node = nodes[mid]
+        node.left = self._link_balanced(nodes, lo, mid)
+        node.right = self._link_balanced(nodes, mid + 1, hi)
+        node.size = hi - lo
+
+        return node
+        
     def min(self):
         """
         Returns the smallest key in the BST.
@@ -146,15 +476,16 @@ class BinarySearchTree:
         key in this subtree is the key at the subtree root;
         
         Otherwise, the smallest key in the subtree is the
-        smallest key in the subtree rooted at the left link.
+        smallest key in the subtree rooted at the left link:
+        follow left links until the left link is null.
         """
         if subtree is None:
             return None
         
-        if subtree.left is None:
-            return subtree
-        else:
-            return self._min(subtree.left)
+        while subtree.left is not None:
+            subtree = subtree.left
+        
+        return subtree
         
     def max(self):
         """
@@ -170,15 +501,16 @@ class BinarySearchTree:
         key in this subtree is the key at the subtree root;
         
         Otherwise, the largest key in the subtree is the
-        largest key in the subtree rooted at the right link.
+        largest key in the subtree rooted at the right link:
+        follow right links until the right link is null.
         """
         if subtree is None:
             return None
         
-        if subtree.right is None:
-            return subtree.key
-        else:
-            return self._max(subtree.right)
+        while subtree.right is not None:
+            subtree = subtree.right
+        
+        return subtree.key
 
     def floor(self, k):
         """
@@ -201,31 +533,35 @@ class BinarySearchTree:
         (d) If `k > subtree.key`, then the floor of key **COULD**
         be in the right subtree. That is, is there a key smaller
         than or equal to `k` in the right subtree?
-            - if yes, recursively find and return it;
-            - if not, or if `k` is equal to the key at the root,
-            then `subtree.key` is the floor of `k`.
+            - if yes, it is the floor;
+            - if not, then `subtree.key` is the floor of `k`.
+        So, remember `subtree.key` as the best floor so far and
+        look in the right subtree.
+        
+        Repeat until (b) or an empty subtree (a): then the best floor
+        so far, if any, is the floor. Falling off the tree is enough to
+        tell there is no floor: no need to check the subtree's min.
         """
-        # (a)
-        if (subtree is None) or (k < self._min(subtree).key):
-            return None
-        
-        # (b)
-        if k == subtree.key:
-            return subtree.key
-        
-        # (c) MUST be in the left subtree
-        if k < subtree.key:
-            return self._floor(k, subtree.left)
+        floor = None
         
-        # (d) COULD be in the right subtree
-        if k > subtree.key:
-            floor = self._floor(k, subtree.right)
+        # (a)
+        while subtree is not None:
+            key = subtree.key
             
-            # if not
-            if floor is None:
-                return subtree.key
+            # (b)
+            if k == key:
+                return key
+            
+            # (c) MUST be in the left subtree
+            if k < key:
+                subtree = subtree.left
+            
+            # (d) COULD be in the right subtree
             else:
-                return floor
+                floor = key
+                subtree = subtree.right
+        
+        return floor
     
     def ceiling(self, k):
         """
@@ -243,36 +579,39 @@ class BinarySearchTree:
         (b) If `k == subtree.key`, then `k` is the ceiling.
         
         (c) If `k > subtree.key`, then the ceiling of `k` **MUST**
-        be in the right subtree: recursively look for it.
+        be in the right subtree: look for it there.
         
         (d) If `k < subtree.key`, then the ceiling of key **COULD**
         be in the left subtree. That is, is there a key larger
         than or equal to `k` in the left subtree?
-            - if yes, recursively find and return it;
-            - if not, or if `k` is equal to the key at the root,
-            then `subtree.key` is the ceiling of `k`.
-        """
-        # (a)
-        if (subtree is None) or (k > self._max(subtree)):
-            return None
+            - if yes, it is the ceiling;
+            - if not, then `subtree.key` is the ceiling of `k`.
+        So, remember `subtree.key` as the best ceiling so far and
+        look in the left subtree.
         
-        # (b)
-        if k == subtree.key:
-            return subtree.key
-        
-        # (c) MUST be in the right subtree. Find and return it.
-        if k > subtree.key:
-            return self._ceiling(k, subtree.right)
+        Repeat until (b) or an empty subtree (a): then the best
+        ceiling so far, if any, is the ceiling.
+        """
+        ceiling = None
         
-        # (d) COULD be in the left subtree
-        if k < subtree.key:
-            ceiling = self._ceiling(k, subtree.left)
+        # (a)
+        while subtree is not None:
+            key = subtree.key
             
-            # if it is not in the left subtree
-            if ceiling is None:
-                return subtree.key
+            # (b)
+            if k == key:
+                return key
+            
+            # (c) MUST be in the right subtree
+            if k > key:
+                subtree = subtree.right
+            
+            # (d) COULD be in the left subtree
             else:
-                return ceiling
+                ceiling = key
+                subtree = subtree.left
+        
+        return ceiling
 
     def select(self, r):
         """
@@ -294,34 +633,37 @@ class BinarySearchTree:
         (a) If `r == size(subtree.left)`, we return the key
         at the subtree root;
         
-        (b) If `r < size(subtree.left)`, we look (recursively)
-        for the key of rank `r` in the left subtree;
+        (b) If `r < size(subtree.left)`, we look for the key of
+        rank `r` in the left subtree;
         
-        (c) If `r > size(subtree.left)`, we look (recursively)
-        for the key of rank (r - size(subtree.left) - 1)
-        in the right subtree.
+        (c) If `r > size(subtree.left)`, we look for the key of
+        rank (r - size(subtree.left) - 1) in the right subtree.
+        
+        and repeat from (a) in that subtree.
         """
-        left_size = self._size(subtree.left)
-        # (a)
-        if r == left_size:
-            return subtree.key
-        # (b)
-        elif r < left_size:
-            return self._select(r, subtree.left)
-        # (c)
-        else: # r > left_size:
-            new_r = r - left_size - 1
-            return self._select(new_r, subtree.right)
+        while True:
+            left = subtree.left
+            left_size = 0 if left is None else left.size
+            # (a)
+            if r == left_size:
+                return subtree.key
+            # (b)
+            elif r < left_size:
+                subtree = left
+            # (c)
+            else: # r > left_size:
+                r -= left_size + 1
+                subtree = subtree.right
 
     def rank(self, k):
         """
         Returns the rank (0 <= rank < BST size) of the given key `k`.
         In other words, the number of keys in the symbol table
         strictly less than `k`.
-        """
-        if not self.contains(k):
-            raise KeyError(f"`{k}` not in the BST!")
         
+        Raises `KeyError` if `k` is not in the BST: the same descent
+        finds the key and counts its rank.
+        """
         return self._rank(k, self.root)
         
     def _rank(self, k, subtree):
@@ -329,88 +671,148 @@ class BinarySearchTree:
         If `k == subtree.key`, we return the number of keys in the
         left subtree;
         
-        if `k < subtree.key`, we recursively look for the rank of
-        the key in the left subtree;
+        if `k < subtree.key`, we look for the rank of the key in
+        the left subtree;
         
-        if `k > subtree.key`, we return the sum of:
+        if `k > subtree.key`, the rank is the sum of:
             + `1` (to count the key at the root)
             + left subtree size
-            + (recursively) the rank of the key in the right subtree.
+            + the rank of the key in the right subtree.
+        
+        Iterative: the keys counted on the way down (the last two
+        terms) are accumulated in `rank`. If we hit an empty subtree,
+        `k` is not in the BST: raises `KeyError`.
         """
-        if k == subtree.key:
-            return self._size(subtree.left)
+        rank = 0
         
-        elif k < subtree.key:
-            return self._rank(k, subtree.left)
+        while subtree is not None:
+            key = subtree.key
+            left = subtree.left
+            
+            if k == key:
+                return rank + (0 if left is None else left.size)
+            
+            elif k < key:
+                subtree = left
+            
+            else:   # k > subtree.key
+                rank += 1 + (0 if left is None else left.size)
+                subtree = subtree.right
         
-        else:   # k > subtree.key
-            return 1 + self._size(subtree.left) + self._rank(k, subtree.right)
+        raise KeyError(f"`{k}` not in the BST!")
 
     def del_min(self):
         """
         Removes the smallest key from the BST.
         """
-        if self.is_empty:
+        if self.root is None:
             raise KeyError("BST is empty.")
         
+        self._cache.clear()
+        smallest = self.root
+        while smallest.left is not None:
+            smallest = smallest.left
+        
         self.root = self._del_min(self.root)
+        self._free(smallest)
+        self._shrink()
         
     def _del_min(self, subtree):
         """
-        We go left (recursively) until we find a node that
-        that has a null left link and then replace the link
-        to that node by its right link.
+        We go left until we find a node that has a null left
+        link and then replace the link to that node by its right link.
+        
+        Every node we go left from is an ancestor of the removed node,
+        so its size goes down by one on the way: no path to save.
+        
+        Returns the new root of `subtree`.
         """
         # if given node is the smallest
         if subtree.left is None:
             # replace the node with its right link
             return subtree.right
-        else:
-            # recursively look for next smaller node
-            subtree.left = self._del_min(subtree.left)
         
-        # update subtree size
-        subtree.size = 1 + self._size(subtree.left) + self._size(subtree.right)
+        # stop at the parent of the smallest node
+        parent = subtree
+        parent.size -= 1
+        while parent.left.left is not None:
+            parent = parent.left
+            parent.size -= 1
+        
+        parent.left = parent.left.right
         return subtree
             
     def del_max(self):
         """
         Removes the LARGEST key from the BST.
         """
-        if self.is_empty:
+        if self.root is None:
             raise KeyError("BST is empty.")
         
+        self._cache.clear()
+        largest = self.root
+        while largest.right is not None:
+            largest = largest.right
+        
         self.root = self._del_max(self.root)
+        self._free(largest)
+        self._shrink()
         
     def _del_max(self, subtree):
         """
-        We go right (recursively) until we find a node that
-        that has a null right link and then replace the link
-        to that node by its left link.
+        We go right until we find a node that has a null right
+        link and then replace the link to that node by its left link.
+        
+        As in `_del_min`, sizes go down by one on the way.
+        
+        Returns the new root of `subtree`.
         """
         # if given node is the largest
         if subtree.right is None:
             # replace the node with its left link
             return subtree.left
-        else:
-            # recursively look for next greater node in the right subtree
-            subtree.right = self._del_max(subtree.right)
         
-        # update subtree size
-        subtree.size = 1 + self._size(subtree.left) + self._size(subtree.right)
+        # stop at the parent of the largest node
+        parent = subtree
+        parent.size -= 1
+        while parent.right.right is not None:
+            parent = parent.right
+            parent.size -= 1
+        
+        parent.right = parent.right.left
         return subtree
             
     def del_key(self, k):
         """
         Removes the given key from the BST.
         """
-        if self.is_empty:
+        if self.root is None:
             raise KeyError("BST is empty.")
         
         if not self.contains(k):
             raise KeyError(f"Key `{k}` not in the BST.")
         
+        self._uncache(k)
         self.root = self._del_key(k, self.root)
+        self._shrink()
+
+    def _shrink(self):
+        """
+        Rebuilds the whole tree as a perfectly balanced BST (see
+        `_rebuild`) once deletions have removed half of the keys it
+        held at its largest since the last rebuild.
+
+        Hibbard deletion leaves the tree less balanced over time,
+        and `_rebalance` only runs on insertions. The rebuild is
+        linear in the size of the tree, but only happens after at
+        least as many deletions, so deletions stay amortized
+        O(log n).
+        """
+        size = self.size()
+
+        if 2 * size < self._max_size:
+            self.root = self._rebuild(self.root)
+            self._max_size = size
         
     def _del_key(self, k, subtree):
         """
@@ -442,19 +844,25 @@ class BinarySearchTree:
             (all the keys that are less than both the deleted key and its
             successor).
         """
-        if k < subtree.key:
+        key = subtree.key
+        
+        if k < key:
             subtree.left = self._del_key(k, subtree.left)
         
-        elif k > subtree.key:
+        elif k > key:
             subtree.right = self._del_key(k, subtree.right)
         
         else: # k == subtree.key
             ### CASE 1: node has only 1 child
             if subtree.left is None:
-                return subtree.right
+                child = subtree.right
+                self._free(subtree)
+                return child
             
             if subtree.right is None:
-                return subtree.left
+                child = subtree.left
+                self._free(subtree)
+                return child
             
             ### CASE 2: node has both children -> apply Hibbard's:
             deleted_node = subtree
@@ -469,11 +877,59 @@ class BinarySearchTree:
             
             # keep the left subtree in the left link
             subtree.left = deleted_node.left
+            
+            # the successor takes the deleted node's place (and size)
+            subtree.size = deleted_node.size - 1
+            self._free(deleted_node)
+            return subtree
         
-        # update sizes
-        subtree.size = 1 + self._size(subtree.left) + self._size(subtree.right)
+        # update sizes: the subtree lost exactly one node
+        subtree.size -= 1
         return subtree
 
+    def __iter__(self):
+        """
+        Iterates over the keys in ascending order.
+        """
+        for node in self._iter_nodes():
+            yield node.key
+
+    def values(self):
+        """
+        Iterates over the values, in ascending order of their keys.
+        """
+        for node in self._iter_nodes():
+            yield node.val
+
+    def items(self):
+        """
+        Iterates over the `(key, value)` pairs in ascending key order.
+        """
+        for node in self._iter_nodes():
+            yield node.key, node.val
+
+    def _iter_nodes(self):
+        """
+        Lazy in-order traversal, with an explicit stack of at most
+        `h` nodes: no recursion, and the links are only read.
+
+        (A Morris traversal would need no stack, but it threads
+        temporary links through the tree while it runs: a paused or
+        abandoned iteration would leave the BST corrupted for every
+        other operation.)
+        """
+        stack = []
+        node = self.root
+
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+            node = stack.pop()
+            yield node
+            node = node.right
+
     def keys(self, lo=None, hi=None):
         """
         Returns all keys in the BST between `lo` (inclusive) and
@@ -507,22 +963,379 @@ class BinarySearchTree:
         
         if hi > subtree.key:
             self._in_order(subtree.right, lo, hi, q)
-        
-    
+
+
+class BinarySearchTreeSoA:
+    """
+    # Binary search tree, as a structure of arrays (SoA)
+
+    Same symbol table as `BinarySearchTree`, but there is no `_Node`
+    object graph: a node is just an index `i` into parallel arrays
+
+        keys[i], vals[i]    its key and value
+        left[i], right[i]   the indices of its children
+        sizes[i]            the size of its subtree
+
+    and null links are `NULL`. Nodes are numbered in insertion
+    order, so the root is node `0`.
+
+    Links and sizes live in contiguous arrays of machine ints, so
+    following a link is an array read instead of an attribute lookup
+    on a separate Python object per node. The searches are plain
+    functions on the arrays (`_soa_get`, `_soa_rank`, `_soa_select`).
+
+    Meant for large, read-mostly trees: it supports insertion
+    and the read operations, but not deletion.
+
+    For keys of a single machine type, `key_typecode` (an `array`
+    typecode, e.g. `'q'` for 64-bit ints) keeps the keys in an array
+    as well: 8 bytes per int key instead of a list slot plus an int
+    object. Reading a key from an array creates an int object, though,
+    so searches are somewhat slower: it trades time for memory.
+    """
+    def __init__(self, key_typecode=None):
+        self.root = NULL
+        self.keys = [] if key_typecode is None else array(key_typecode)
+        self.vals = []
+        self.left = array('l')
+        self.right = array('l')
+        self.sizes = array('l')
+
+    @property
+    def is_empty(self):
+        return self.root == NULL
+
+    def size(self):
+        """
+        Returns the size of the BST: there are no deletions, so
+        every node ever added is in the tree.
+        """
+        return len(self.keys)
+
+    def put(self, k, v):
+        """
+        Goes down the tree to the null link where `k` belongs and
+        links a new node there, at the end of the arrays, adding `1`
+        to the size of every node on the way.
+
+        If `k` is already in the BST, updates its value instead.
+        """
+        keys, left, right = self.keys, self.left, self.right
+        sizes = self.sizes
+        path = []
+        links = None
+        i = new = len(keys)
+
+        if self.root != NULL:
+            i = self.root
+
+            while True:
+                key = keys[i]
+
+                if k == key:
+                    self.vals[i] = v
+                    return
+
+                path.append(i)
+                links = left if k < key else right
+                if links[i] == NULL:
+                    break
+
+                i = links[i]
+
+        # store the key before linking the node in: a typed key array
+        # may reject `k`, and then the tree must be left as it was
+        keys.append(k)
+        self.vals.append(v)
+        left.append(NULL)
+        right.append(NULL)
+        sizes.append(1)
+
+        if links is None:
+            self.root = new
+        else:
+            links[i] = new
+
+        for i in path:
+            sizes[i] += 1
+
+    def put_many(self, pairs):
+        """
+        Inserts all the `(key, value)` pairs, as `put` in the given
+        order would (for a repeated key, the last value wins), but
+        lays the arrays out once instead, as
+        `BinarySearchTree.put_many`: the new pairs are sorted and
+        merged with the keys already in the BST, and the result is
+        stored as a perfectly balanced BST, in O(n + m log m) time
+        for `m` pairs.
+
+        Nodes are renumbered in preorder, so the root is still
+        node `0`.
+        """
+        items = sorted(pairs, key=lambda pair: pair[0])  # stable
+        if not items:
+            return
+
+        keys, vals = self.keys, self.vals
+        nodes = self._indices_in_order()
+        merged_keys, merged_vals = [], []
+        i = 0
+
+        for k, v in items:
+            while i < len(nodes) and keys[nodes[i]] < k:
+                merged_keys.append(keys[nodes[i]])
+                merged_vals.append(vals[nodes[i]])
+                i += 1
+
+            if merged_keys and merged_keys[-1] == k:
+                merged_vals[-1] = v
+            else:
+                if i < len(nodes) and keys[nodes[i]] == k:
+                    i += 1
+                merged_keys.append(k)
+                merged_vals.append(v)
+
+        for j in nodes[i:]:
+            merged_keys.append(keys[j])
+            merged_vals.append(vals[j])
+
+        self._lay_out_balanced(merged_keys, merged_vals)
+
+    def _indices_in_order(self):
+        """
+        Returns the indices of all the nodes, in ascending key order.
+        """
+        left, right = self.left, self.right
+        indices = []
+        stack = []
+        i = self.root
+
+        while stack or i != NULL:
+            while i != NULL:
+                stack.append(i)
+                i = left[i]
+
+            i = stack.pop()
+            indices.append(i)
+            i = right[i]
+
+        return indices
+
+    def _lay_out_balanced(self, keys, vals):
+        """
+        Replaces the arrays with a balanced BST of the pairs of
+        `keys` and `vals`, sorted by key: the middle key at the root
+        and, recursively, the left and right halves as its subtrees,
+        numbered in preorder.
+        """
+        n = len(keys)
+        # built aside and swapped in at the end: a typed key array may
+        # reject a key, and then the tree must be left as it was
+        new_keys = self.keys[:0]
+        new_vals = []
+        left = array('l', [NULL]) * n
+        right = array('l', [NULL]) * n
+        sizes = array('l')
+
+        # (lo, hi, parent, parent's links to the subtree's root)
+        stack = [(0, n, NULL, None)]
+
+        while stack:
+            lo, hi, parent, links = stack.pop()
+            if lo >= hi:
+                continue
+
+            mid = (lo + hi) // 2
+            i = len(new_keys)
+            new_keys.append(keys[mid])
+            new_vals.append(vals[mid])
+            sizes.append(hi - lo)
+            if links is not None:
+                links[parent] = i
+
+            stack.append((mid + 1, hi, i, right))
+            stack.append((lo, mid, i, left))
+
+        self.keys, self.vals = new_keys, new_vals
+        self.left, self.right, self.sizes = left, right, sizes
+        self.root = 0 if n else NULL
+
+    def rank(self, k):
+        """
+        Returns the number of keys in the BST strictly less than
+        `k`, as `BinarySearchTree.rank`.
+        """
+        rank = _soa_rank(self.root, self.keys, self.left, self.right,
+                         self.sizes, k)
+
+        if rank == NULL:
+            raise KeyError(f"`{k}` not in the BST!")
+
+        return rank
+
+    def select(self, r):
+        """
+        Returns the key of rank `r`, as `BinarySearchTree.select`.
+        """
+        if r < 0 or r >= self.size():
+            raise ValueError
+
+        i = _soa_select(self.root, self.left, self.right, self.sizes, r)
+        return self.keys[i]
+
+    def get(self, k):
+        """
+        Returns the value associated with `k`, or None.
+        """
+        i = _soa_get(self.root, self.keys, self.left, self.right, k)
+        return None if i == NULL else self.vals[i]
+
+    def get_many(self, ks):
+        """
+        Returns a list with the value associated with each key in
+        `ks` (None for the missing ones), in the same order.
+
+        The arrays and the root are looked up once for the whole
+        batch, and the search loop is inlined: no method call per
+        key.
+        """
+        keys, vals = self.keys, self.vals
+        left, right = self.left, self.right
+        root = self.root
+        result = []
+        append = result.append
+
+        for k in ks:
+            i = root
+
+            while i != NULL:
+                key = keys[i]
+
+                if k == key:
+                    break
+
+                i = left[i] if k < key else right[i]
+
+            append(None if i == NULL else vals[i])
+
+        return result
+
+    def contains(self, k):
+        """
+        Does this BST contain the given key? (even if its value
+        is None)
+        """
+        return _soa_get(self.root, self.keys, self.left, self.right,
+                        k) != NULL
+
+    __contains__ = contains
+
+    def min(self):
+        """
+        Returns the smallest key in the BST.
+        """
+        if self.root == NULL:
+            return None
+
+        left = self.left
+        i = self.root
+        while left[i] != NULL:
+            i = left[i]
+
+        return self.keys[i]
+
+    def max(self):
+        """
+        Returns the LARGEST key in the BST.
+        """
+        if self.root == NULL:
+            return None
+
+        right = self.right
+        i = self.root
+        while right[i] != NULL:
+            i = right[i]
+
+        return self.keys[i]
+
+    def keys_in_order(self, lo=None, hi=None):
+        """
+        Returns all keys in the BST between `lo` (inclusive) and
+        `hi` (also inclusive) in ascending order, as
+        `BinarySearchTree.keys`.
+
+        In-order traversal with an explicit stack of node indices,
+        skipping the subtrees that are out of range.
+        """
+        keys, left, right = self.keys, self.left, self.right
+        q = []
+        stack = []
+        i = self.root
+
+        while stack or i != NULL:
+            # go left as far as keys may still be >= lo
+            while i != NULL:
+                stack.append(i)
+                i = left[i] if lo is None or lo < keys[i] else NULL
+
+            i = stack.pop()
+            key = keys[i]
+
+            if hi is not None and key > hi:
+                break
+
+            if lo is None or key >= lo:
+                q.append(key)
+
+            i = right[i]
+
+        return q
+
+
 #################
 ###   TESTS   ###
 #################
+import sys
 import unittest
+from random import randint, shuffle
 
 class TestsBST(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        # trees shared by the tests that only query them: built once
+        # for the class (copying them per test would be slower than
+        # inserting the keys again)
+        cls.fruits = BinarySearchTree()
+        for key, val in [(5, "apple"), (2, "banana"), (7, "cherry"),
+                         (6, "date"), (3, "eggplant")]:
+            cls.fruits.put(key, val)
+        #      (5)
+        #     /   \
+        #   (2)    (7)
+        #   / \    / \
+        #     (3) (6)
+
+        cls.numbers = BinarySearchTree()
+        for key, val in [(50, 50), (70, 70), (30, 20), (10, 10),
+                         (80, 80), (40, 40)]:
+            cls.numbers.put(key, val)
+
     def setUp(self) -> None:
         self.bst = BinarySearchTree()
+        # nodes freed by other tests' trees
+        self.bst._pool.clear()
 
     def test_tree_is_empty(self):
         self.assertTrue(self.bst.is_empty)
         self.bst.root = self.bst._Node(1, 'ace')
         self.assertFalse(self.bst.is_empty)
     
+    def test_Node_has_no_dict(self):
+        node = self.bst._Node(1, 'ace')
+        self.assertFalse(hasattr(node, '__dict__'))
+        with self.assertRaises(AttributeError):
+            node.color = True
+
     def test_ordering_property_empty_tree(self):
         self.assertTrue(self.assertOrderingProperty(self.bst.root))
     
@@ -582,24 +1395,38 @@ class TestsBST(unittest.TestCase):
         #     (1) (6)
         with self.assertRaises(AssertionError):
             self.assertOrderingProperty(root)
+
+    def test_ordering_property_key_below_grandparent(self):
+        root = self.bst.root = self.bst._Node(5, 'apple')
+        root.left = self.bst._Node(2, "banana")
+        root.left.right = self.bst._Node(6, "fig")
+        #      (5)
+        #     /
+        #   (2)
+        #     \
+        #     (6)  in order under (2), but not under (5)
+        with self.assertRaises(AssertionError):
+            self.assertOrderingProperty(root)
     
     def assertOrderingProperty(self, node):
         """
-        Asserts that the binary tree is in symmetric order.
+        Asserts that the binary tree is in symmetric order: an in-order
+        traversal (with an explicit stack) meets the keys in strictly
+        ascending order.
         """
-        if node is None:
-            return True
-
-        left_subtree = node.left
-        right_subtree = node.right
-
-        if left_subtree is not None:
-            self.assertLess(left_subtree.key, node.key)
-            self.assertOrderingProperty(left_subtree)
-
-        if right_subtree is not None:
-            self.assertGreater(right_subtree.key, node.key)
-            self.assertOrderingProperty(right_subtree)
+        stack = []
+        prev = None
+        
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            
+            node = stack.pop()
+            if prev is not None:
+                self.assertLess(prev.key, node.key)
+            prev = node
+            node = node.right
             
         return True
 
@@ -638,6 +1465,84 @@ class TestsBST(unittest.TestCase):
         result = self.bst.get(5)
         self.assertEqual(result, None)
 
+    def test_get_cache(self):
+        self.bst.put(5, "apple")
+        self.bst.put(2, "banana")
+        self.assertEqual("apple", self.bst.get(5))
+        self.assertIsNone(self.bst.get(7))
+        self.assertEqual({5: "apple", 7: None}, self.bst._cache)
+
+        # mutations must not leave stale values behind
+        self.bst.put(5, "cherry")
+        self.bst.put(7, "date")
+        self.assertEqual("cherry", self.bst.get(5))
+        self.assertEqual("date", self.bst.get(7))
+
+        self.bst.del_key(7)
+        self.assertIsNone(self.bst.get(7))
+        self.bst.del_min()
+        self.assertIsNone(self.bst.get(2))
+        self.bst.del_max()
+        self.assertIsNone(self.bst.get(5))
+
+    def test_get_cache_max_size(self):
+        self.bst.CACHE_MAX_SIZE = 3
+        for key in range(5):
+            self.bst.put(key, str(key))
+            self.bst.get(key)
+
+        self.assertEqual([2, 3, 4], list(self.bst._cache))
+        self.assertEqual("0", self.bst.get(0))
+
+        # a hit makes its key the most recently used
+        self.assertEqual("3", self.bst.get(3))
+        self.assertEqual([4, 0, 3], list(self.bst._cache))
+        self.bst.get(1)
+        self.assertEqual([0, 3, 1], list(self.bst._cache))
+
+    def test_get_unhashable_keys(self):
+        self.bst.put([1, 2], "apple")
+        self.assertEqual("apple", self.bst.get([1, 2]))
+        self.assertEqual({}, self.bst._cache)
+
+        self.bst.put([1, 3], "banana")
+        self.bst.put([1, 2], "cherry")
+        self.assertEqual("cherry", self.bst.get([1, 2]))
+        self.bst.del_key([1, 3])
+        self.assertIsNone(self.bst.get([1, 3]))
+
+    def test_get_deeper_than_recursion_limit(self):
+        # a right-leaning chain: 1 -> 2 -> ... -> n
+        n = sys.getrecursionlimit() + 100
+        node = self.bst.root = self.bst._Node(1, "1")
+        for key in range(2, n + 1):
+            node.right = self.bst._Node(key, str(key))
+            node = node.right
+
+        self.assertEqual(str(n), self.bst.get(n))
+        self.assertIsNone(self.bst.get(n + 1))
+
+    def test_ordered_operations_deeper_than_recursion_limit(self):
+        # a right-leaning chain: 1 -> 2 -> ... -> n, sizes included
+        n = sys.getrecursionlimit() + 100
+        node = self.bst.root = self.bst._Node(1, "1")
+        node.size = n
+        for key in range(2, n + 1):
+            node.right = self.bst._Node(key, str(key))
+            node = node.right
+            node.size = n - key + 1
+
+        self.assertEqual(1, self.bst.min())
+        self.assertEqual(n, self.bst.max())
+        self.assertEqual(n - 1, self.bst.rank(n))
+        self.assertEqual(n - 1, self.bst.select(n - 2))
+        self.assertEqual(n, self.bst.floor(n + 1))
+        self.assertEqual(1, self.bst.ceiling(0))
+
+        self.bst.del_max()
+        self.assertEqual(n - 1, self.bst.max())
+        self.assertEqual(n - 1, self.bst.size())
+
     def test_does_not_contain(self):
         # EMPTY TREE
         self.assertFalse(self.bst.contains(1))
@@ -651,6 +1556,14 @@ class TestsBST(unittest.TestCase):
         #  (2)    (7)
         self.assertFalse(self.bst.contains(1))
         
+    def test_contains_key_with_None_value(self):
+        self.bst.put(5, None)
+        self.assertTrue(self.bst.contains(5))
+        self.assertEqual(0, self.bst.rank(5))
+
+        self.bst.del_key(5)
+        self.assertFalse(self.bst.contains(5))
+
     def test_contains(self):
         root = self.bst.root = self.bst._Node(5, 'apple')
         root.left = self.bst._Node(2, "banana")
@@ -661,6 +1574,8 @@ class TestsBST(unittest.TestCase):
         self.assertTrue(self.bst.contains(5))
         self.assertTrue(self.bst.contains(2))
         self.assertTrue(self.bst.contains(7))
+        self.assertIn(2, self.bst)
+        self.assertNotIn(6, self.bst)
         
     def test_put_new_key(self):
         self.bst.put(5, "apple")
@@ -699,6 +1614,77 @@ class TestsBST(unittest.TestCase):
         self.assertOrderingProperty(self.bst.root)
         self.assertSizeConsistency(self.bst.root)
     
+    def test_put_ascending_keys_stays_balanced(self):
+        n = 1_000
+        for i in range(n):
+            self.bst.put(i, str(i))
+
+        self.assertOrderingProperty(self.bst.root)
+        self.assertSizeConsistency(self.bst.root)
+        self.assertEqual(list(range(n)), self.bst.keys())
+
+        # height within the scapegoat bound, log_{1/alpha}(n)
+        height = 0
+        level = [self.bst.root]
+        while level:
+            height += 1
+            level = [child for node in level
+                     for child in (node.left, node.right)
+                     if child is not None]
+        self.assertLessEqual(height - 1, log(n, 1 / self.bst._alpha))
+
+    def test_rebuild(self):
+        root = self.bst.root = self.bst._Node(1, "1")
+        root.right = self.bst._Node(2, "2")
+        root.right.right = self.bst._Node(3, "3")
+        root.size, root.right.size = 3, 2
+
+        root = self.bst._rebuild(root)
+        #     (2)
+        #    /   \
+        #  (1)    (3)
+        self.assertEqual(2, root.key)
+        self.assertEqual(1, root.left.key)
+        self.assertEqual(3, root.right.key)
+        self.assertEqual([3, 1, 1], [root.size, root.left.size,
+                                     root.right.size])
+
+    def test_from_sorted(self):
+        n = 100
+        bst = BinarySearchTree.from_sorted((i, str(i)) for i in range(n))
+
+        self.assertEqual(n, bst.size())
+        self.assertEqual("77", bst.get(77))
+        self.assertEqual(list(range(n)), bst.keys())
+        self.assertEqual(n // 2, bst.root.key)
+        self.bst = bst
+        self.assertOrderingProperty(bst.root)
+        self.assertSizeConsistency(bst.root)
+
+        self.assertTrue(BinarySearchTree.from_sorted([]).is_empty)
+
+    def test_from_sorted_not_sorted(self):
+        with self.assertRaises(ValueError):
+            BinarySearchTree.from_sorted([(2, "b"), (1, "a")])
+        with self.assertRaises(ValueError):
+            BinarySearchTree.from_sorted([(1, "a"), (1, "b")])
+
+    def test_put_many(self):
+        self.bst.put(5, "apple")
+        self.bst.put(2, "banana")
+        five = self.bst.root
+
+        self.bst.put_many([(7, "cherry"), (2, "date"), (1, "eggplant"),
+                           (7, "fig")])
+        self.bst.put_many([])
+
+        self.assertEqual([1, 2, 5, 7], self.bst.keys())
+        self.assertEqual("date", self.bst.get(2))
+        self.assertEqual("fig", self.bst.get(7))
+        self.assertIs(five, self.bst.root)  # nodes reused
+        self.assertOrderingProperty(self.bst.root)
+        self.assertSizeConsistency(self.bst.root)
+
     def test_size_empty_tree(self):
         """
         Tests `size` method.
@@ -797,17 +1783,19 @@ class TestsBST(unittest.TestCase):
         consistent in the data structure rooted at that node,
         raises assertion error otherwise.
         """
-        if subtree is None:
-            return True
-        
-        subtree_size = self.bst._size(subtree)
-        left_size = self.bst._size(subtree.left)
-        right_size = self.bst._size(subtree.right)
-        expected_size = 1 + left_size + right_size
-        self.assertTrue( subtree_size == expected_size)
-                
-        self.assertSizeConsistency(subtree.left)
-        self.assertSizeConsistency(subtree.right)
+        # every node checked once, with an explicit stack
+        stack = [] if subtree is None else [subtree]
+        
+        while stack:
+            node = stack.pop()
+            left_size = self.bst._size(node.left)
+            right_size = self.bst._size(node.right)
+            self.assertEqual(1 + left_size + right_size, node.size)
+            
+            if node.left is not None:
+                stack.append(node.left)
+            if node.right is not None:
+                stack.append(node.right)
         
         return True
     
@@ -853,12 +1841,7 @@ class TestsBST(unittest.TestCase):
         self.assertIsNone(self.bst.floor(1))
     
     def test_floor(self):
-        self.bst.put(50, 50)
-        self.bst.put(70, 70)
-        self.bst.put(30, 20)
-        self.bst.put(10, 10)
-        self.bst.put(80, 80)
-        self.bst.put(40, 40)
+        self.bst = self.numbers
 
         # floor == root
         self.assertEqual(self.bst.floor(50), 50)
@@ -884,12 +1867,7 @@ class TestsBST(unittest.TestCase):
         self.assertIsNone(self.bst.ceiling(1))
     
     def test_ceiling(self):
-        self.bst.put(50, 50)
-        self.bst.put(70, 70)
-        self.bst.put(30, 20)
-        self.bst.put(10, 10)
-        self.bst.put(80, 80)
-        self.bst.put(40, 40)
+        self.bst = self.numbers
 
         # ceiling == root
         self.assertEqual(self.bst.ceiling(50), 50)
@@ -925,16 +1903,7 @@ class TestsBST(unittest.TestCase):
             self.assertIsNone(self.bst.select(1))
         
     def test_select(self):
-        self.bst.put(5, "apple")
-        self.bst.put(2, "banana")
-        self.bst.put(7, "cherry")
-        self.bst.put(6, "date")
-        self.bst.put(3, "eggplant")
-        #      (5)
-        #     /   \
-        #   (2)    (7)
-        #   / \    / \
-        #     (3) (6)
+        self.bst = self.fruits
         self.assertEqual(2, self.bst.select(0))
         self.assertEqual(3, self.bst.select(1))
         self.assertEqual(5, self.bst.select(2))
@@ -952,16 +1921,7 @@ class TestsBST(unittest.TestCase):
             self.bst.rank(2)
         
     def test_rank(self):
-        self.bst.put(5, "apple")
-        self.bst.put(2, "banana")
-        self.bst.put(7, "cherry")
-        self.bst.put(6, "date")
-        self.bst.put(3, "eggplant")
-        #      (5)
-        #     /   \
-        #   (2)    (7)
-        #   / \    / \
-        #     (3) (6)
+        self.bst = self.fruits
         self.assertEqual(0, self.bst.rank(2))
         self.assertEqual(1, self.bst.rank(3))
         self.assertEqual(2, self.bst.rank(5))
@@ -1041,11 +2001,11 @@ class TestsBST(unittest.TestCase):
         self.assertSizeConsistency(bst.root)
         self.assertIsNone(bst.root.right)
         
-        bst.del_max() # 5
+        bst.del_max() # 5: 2 keys left out of 5, rebuilt
         self.assertFalse(bst.contains(5))
         self.assertOrderingProperty(bst.root)
         self.assertSizeConsistency(bst.root)
-        self.assertEqual(2, bst.root.key)
+        self.assertEqual(3, bst.root.key)
         
         bst.del_max() # 3
         self.assertFalse(bst.contains(3))
@@ -1117,6 +2077,82 @@ class TestsBST(unittest.TestCase):
         bst.del_key(8)
         self.assertTrue(bst.is_empty)        
     
+    def test_deletions_rebuild(self):
+        n = 1_000
+        keys = list(range(n))
+        shuffle(keys)
+        for key in keys:
+            self.bst.put(key, str(key))
+
+        for key in keys[:n // 2 + 1]:
+            self.bst.del_key(key)
+
+        # fewer than half of the keys left: the tree was rebuilt
+        self.assertEqual(n // 2 - 1, self.bst._max_size)
+        self.assertEqual(sorted(keys[n // 2 + 1:]), self.bst.keys())
+        self.assertOrderingProperty(self.bst.root)
+        self.assertSizeConsistency(self.bst.root)
+        # middle key at the root
+        self.assertEqual(self.bst.size() // 2,
+                         self.bst._size(self.bst.root.left))
+
+    def test_removed_nodes_are_reused(self):
+        for key in [5, 2, 7, 6, 1, 8]:
+            self.bst.put(key, str(key))
+
+        removed = [self.bst.root.left.left, self.bst.root.right]  # 1, 7
+        self.bst.del_min()
+        self.bst.del_key(7)
+        self.assertEqual(removed, self.bst._pool)
+        self.assertIsNone(removed[0].key)
+        self.assertIsNone(removed[1].right)
+
+        self.bst.put(3, "3")
+        self.bst.put(4, "4")
+        self.assertEqual([], self.bst._pool)
+        self.assertIs(removed[1], self.bst.root.left.right)
+        self.assertEqual([2, 3, 4, 5, 6, 8], self.bst.keys())
+        self.assertOrderingProperty(self.bst.root)
+        self.assertSizeConsistency(self.bst.root)
+
+    def test_pool_max_size(self):
+        self.bst.POOL_MAX_SIZE = 2
+        for key in range(5):
+            self.bst.put(key, str(key))
+        for _ in range(5):
+            self.bst.del_max()
+
+        self.assertEqual(2, len(self.bst._pool))
+
+    def test_pool_is_shared(self):
+        other = BinarySearchTree()
+        other.put(1, "1")
+        node = other.root
+        other.del_key(1)
+
+        self.bst.put(2, "2")
+        self.assertIs(node, self.bst.root)
+        self.assertEqual([], other._pool)
+
+    def test_iter(self):
+        self.assertEqual([], list(self.bst))
+        self.assertEqual([], list(self.bst.items()))
+
+        for key in [5, 2, 7, 6, 1, 8]:
+            self.bst.put(key, str(key))
+
+        self.assertEqual([1, 2, 5, 6, 7, 8], list(self.bst))
+        self.assertEqual(["1", "2", "5", "6", "7", "8"],
+                         list(self.bst.values()))
+        self.assertEqual([(1, "1"), (2, "2"), (5, "5")],
+                         list(self.bst.items())[:3])
+
+        # a paused iteration leaves the tree intact
+        keys = iter(self.bst)
+        next(keys)
+        self.assertEqual("7", self.bst.get(7))
+        self.assertEqual([2, 5, 6, 7, 8], list(keys))
+
     def test_keys_empty_tree(self):
         self.assertEqual([], self.bst.keys())
     
@@ -1179,3 +2215,206 @@ class TestsBST(unittest.TestCase):
         result = bst.keys(0, 10)
         expected = [1, 2, 5, 6, 7, 8]
         self.assertEqual(expected, result)
+
+
+class TestsBinarySearchTreeSoA(unittest.TestCase):
+    def setUp(self) -> None:
+        self.soa = BinarySearchTreeSoA()
+
+    def test_empty_tree(self):
+        self.assertTrue(self.soa.is_empty)
+        self.assertEqual(0, self.soa.size())
+        self.assertIsNone(self.soa.get(1))
+        self.assertIsNone(self.soa.min())
+        self.assertIsNone(self.soa.max())
+        self.assertEqual([], self.soa.keys_in_order())
+
+    def test_put_and_get(self):
+        for key, val in [(5, "apple"), (2, "banana"), (7, "cherry"),
+                         (4, "date")]:
+            self.soa.put(key, val)
+        #     (5)
+        #    /   \
+        #  (2)    (7)
+        # /   \
+        #      (4)
+        self.assertEqual(0, self.soa.root)
+        self.assertEqual([1, NULL, NULL, NULL], list(self.soa.left))
+        self.assertEqual([2, 3, NULL, NULL], list(self.soa.right))
+
+        self.assertEqual("date", self.soa.get(4))
+        self.assertTrue(self.soa.contains(7))
+        self.assertFalse(self.soa.contains(3))
+        self.assertEqual(4, self.soa.size())
+
+    def test_contains_key_with_None_value(self):
+        self.soa.put(5, None)
+
+        self.assertTrue(self.soa.contains(5))
+        self.assertIn(5, self.soa)
+        self.assertNotIn(1, self.soa)
+        self.assertEqual(0, _soa_get(self.soa.root, self.soa.keys,
+                                     self.soa.left, self.soa.right, 5))
+        self.assertEqual(NULL, _soa_get(self.soa.root, self.soa.keys,
+                                        self.soa.left, self.soa.right, 1))
+
+    def test_rank_and_select(self):
+        for key in [5, 2, 7, 6, 3]:
+            self.soa.put(key, str(key))
+
+        self.assertEqual([5, 2, 2, 1, 1], list(self.soa.sizes))
+        self.assertEqual(2, self.soa.rank(5))
+        self.assertEqual(6, self.soa.select(3))
+
+        with self.assertRaises(KeyError):
+            self.soa.rank(4)
+        with self.assertRaises(ValueError):
+            self.soa.select(5)
+
+    def test_int_keys_array(self):
+        soa = BinarySearchTreeSoA(key_typecode='q')
+        bst = BinarySearchTree()
+
+        for _ in range(500):
+            key = randint(-1_000, 1_000)
+            soa.put(key, str(key))
+            bst.put(key, str(key))
+
+        self.assertIsInstance(soa.keys, array)
+        self.assertEqual(bst.keys(), soa.keys_in_order())
+        for key in range(-1_001, 1_002):
+            self.assertEqual(bst.get(key), soa.get(key))
+        for key in bst.keys()[::10]:
+            self.assertEqual(bst.rank(key), soa.rank(key))
+
+        with self.assertRaises(TypeError):
+            soa.put("a", "b")
+
+    def test_rejected_key_leaves_tree_unchanged(self):
+        soa = BinarySearchTreeSoA(key_typecode='q')
+
+        with self.assertRaises(TypeError):
+            soa.put(1.5, "a")
+        self.assertTrue(soa.is_empty)
+        self.assertEqual(0, soa.size())
+
+        soa.put(1, "a")
+        soa.put(3, "c")
+        with self.assertRaises(OverflowError):
+            soa.put(2**70, "big")
+        with self.assertRaises(OverflowError):
+            soa.put(-2**70, "small")
+
+        self.assertEqual(2, soa.size())
+        self.assertEqual([NULL, NULL], list(soa.left))
+        self.assertEqual([1, NULL], list(soa.right))
+        self.assertEqual([1, 3], soa.keys_in_order())
+        self.assertEqual("c", soa.get(3))
+        self.assertIsNone(soa.get(2**70))
+
+        soa.put(2, "b")
+        self.assertEqual([1, 2, 3], soa.keys_in_order())
+        self.assertEqual(3, soa.size())
+
+    def test_put_many_rejected_key_leaves_tree_unchanged(self):
+        soa = BinarySearchTreeSoA(key_typecode='q')
+        for key in [5, 2, 7]:
+            soa.put(key, str(key))
+
+        with self.assertRaises(OverflowError):
+            soa.put_many([(3, '3'), (2**70, 'big')])
+
+        self.assertEqual([5, 2, 7], list(soa.keys))
+        self.assertEqual([1, NULL, NULL], list(soa.left))
+        self.assertEqual([2, 5, 7], soa.keys_in_order())
+        self.assertEqual([3, 1, 1], list(soa.sizes))
+        self.assertEqual('7', soa.get(7))
+        self.assertIsNone(soa.get(3))
+
+        soa.put_many([(3, '3'), (6, '6')])
+        self.assertEqual([2, 3, 5, 6, 7], soa.keys_in_order())
+
+    def test_put_existing_key(self):
+        self.soa.put(5, "apple")
+        self.soa.put(5, "banana")
+
+        self.assertEqual("banana", self.soa.get(5))
+        self.assertEqual(1, self.soa.size())
+
+    def test_keys_in_order(self):
+        bst = BinarySearchTree()
+        for key in [5, 2, 7, 6, 1, 8]:
+            bst.put(key, str(key))
+            self.soa.put(key, str(key))
+
+        for lo in range(0, 10):
+            for hi in range(lo, 10):
+                self.assertEqual(bst.keys(lo, hi),
+                                 self.soa.keys_in_order(lo, hi))
+
+    def test_same_answers_as_BinarySearchTree(self):
+        bst = BinarySearchTree()
+
+        for _ in range(500):
+            key = randint(0, 1_000)
+            bst.put(key, str(key))
+            self.soa.put(key, str(key))
+
+        self.assertEqual(bst.size(), self.soa.size())
+        self.assertEqual(bst.min(), self.soa.min())
+        self.assertEqual(bst.max(), self.soa.max())
+        self.assertEqual(bst.keys(), self.soa.keys_in_order())
+        self.assertEqual(list(self.soa.sizes[:1]), [bst.size()])
+        self.assertEqual(bst.keys(100, 200),
+                         self.soa.keys_in_order(100, 200))
+
+        for key in range(-1, 1_002):
+            self.assertEqual(bst.get(key), self.soa.get(key))
+
+        for key in bst.keys():
+            self.assertEqual(bst.rank(key), self.soa.rank(key))
+        for r in range(bst.size()):
+            self.assertEqual(bst.select(r), self.soa.select(r))
+
+        queries = list(range(-1, 1_002))
+        self.assertEqual([bst.get(key) for key in queries],
+                         self.soa.get_many(queries))
+        self.assertEqual([], self.soa.get_many([]))
+
+    def test_put_many(self):
+        bst = BinarySearchTree()
+
+        for key in [50, 70, 30]:
+            bst.put(key, str(key))
+            self.soa.put(key, str(key))
+
+        pairs = [(randint(0, 100), i) for i in range(100)]
+        pairs.append((50, "new"))
+        bst.put_many(pairs)
+        self.soa.put_many(pairs)
+
+        self.assertEqual(bst.keys(), self.soa.keys_in_order())
+        self.assertEqual(0, self.soa.root)
+        self.assertEqual(bst.size(), self.soa.sizes[0])
+        self.assertEqual("new", self.soa.get(50))
+        for key in range(-1, 102):
+            self.assertEqual(bst.get(key), self.soa.get(key))
+        for key in bst.keys():
+            self.assertEqual(bst.rank(key), self.soa.rank(key))
+
+        # balanced: every search ends within log2(n) + 1 levels
+        for key in bst.keys():
+            i, depth = 0, 1
+            while self.soa.keys[i] != key:
+                i = (self.soa.left if key < self.soa.keys[i]
+                     else self.soa.right)[i]
+                depth += 1
+            self.assertLessEqual(depth, self.soa.size().bit_length())
+
+    def test_put_many_int_keys_array(self):
+        soa = BinarySearchTreeSoA(key_typecode='q')
+        soa.put_many([(3, 'c'), (1, 'a'), (2, 'b')])
+
+        self.assertIsInstance(soa.keys, array)
+        self.assertEqual([2, 1, 3], list(soa.keys))
+        self.assertEqual([1, 2, 3], soa.keys_in_order())